@@ -10,18 +10,102 @@ Requirements:
 """
 
 from __future__ import annotations
-from typing import Optional, Tuple
-from tictactoe import TicTacToe, Move, Player
+from typing import List, Optional, Tuple
+from tictactoe import N_CELLS, Board, SearchBoard, TicTacToe, Move, Player
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from symmetry import canonical_key, symmetries, unique_moves
+from ai_minimax import MinimaxAI
+from move_ordering import make_orderer
+from anytime import WIN_SCORE, Deadline, SearchTimeout, from_tt, is_proven, terminal_score, to_tt
+from endgame import EndgameSolver
+from opening_book import OpeningBook
+from search_stats import SearchStats
+
+# Depth-limited searches score positions on a different scale, so their table
+# entries are kept apart from full-search ones by XOR-ing this into the key.
+_LIMITED_KEY = 0x2545F4914F6CDD1D
 
 # You may import the Game/Board types used in the provided support code.
 
 class AlphaBetaAI:
-    """Alpha-Beta Pruning AI for Tic‑Tac‑Toe."""
+    """Alpha-Beta Pruning AI for Tic‑Tac‑Toe.
+
+    Results are cached in a transposition table of at most `tt_size` entries
+    which is kept between moves. Pass tt_size=0 to search without one.
+
+    With `symmetry` on, root moves that mirror each other are only searched
+    once, and table entries for positions with at most SYMMETRY_MAX_STONES
+    stones are keyed by the canonical form of the position so all 8
+    rotations/reflections share one entry. Deeper in the game symmetric
+    transpositions are rare and canonicalising every node costs more than it
+    saves, so plain Zobrist keys are used there.
+
+    choose_move(state, time_budget=seconds) runs an anytime search instead:
+    iterative deepening one ply at a time, MinimaxAI.heuristic at the horizon,
+    each iteration searching the previous iteration's best line first, and
+    the best move found so far returned when the time is up. The depth
+    reached, its score and principal variation are left in last_depth,
+    last_score and last_pv.
+
+    `ordering` picks the move-ordering stage (see move_ordering.ORDERINGS):
+    "none", "static", "killers", "history" or "all". `nodes` counts the
+    positions searched by the last choose_move().
+
+    Once at most `endgame_empties` squares are empty, choose_move() switches
+    to an exact win/draw/loss solve (see endgame.py) with its own table; if
+    that does not finish within the time budget the normal search runs in
+    the time left. Pass endgame_empties=0 to turn this off. `proven` is the
+    game's value for the AI (+1 forced win, 0 draw, -1 forced loss) when the
+    last choose_move() proved it, and None otherwise. A timed search can only
+    prove wins this way; the endgame solver proves all three.
+
+    Given an OpeningBook, choose_move() plays the book move whenever the
+    position is in it, without searching; `from_book` says whether it did.
 
-    def __init__(self, ai_player: Player = "X") -> None:
+    With `collect_stats` on, `stats` holds a SearchStats for the last
+    choose_move(): nodes per depth, terminals, evaluations, cutoffs (and at
+    which move they happened) and transposition table hits.
+    """
+
+    SYMMETRY_MAX_STONES = 9
+
+    def __init__(self, ai_player: Player = "X", tt_size: int = 1 << 20, symmetry: bool = True,
+                 ordering: str = "all", endgame_empties: int = 14,
+                 book: Optional[OpeningBook] = None, collect_stats: bool = False) -> None:
         self.ai_player = ai_player
+        self.symmetry = symmetry
+        self.orderer = make_orderer(ordering)
+        self.nodes = 0
+        self.tt: Optional[TranspositionTable] = TranspositionTable(tt_size) if tt_size > 0 else None
+        self.last_depth = 0
+        self.last_score = 0
+        self.last_pv: List[Move] = []
+        self._deadline = Deadline(None)
+        self._pv: List[List[Move]] = [[] for _ in range(N_CELLS + 2)]
+        self._prev_pv: List[Move] = []
+        self.endgame_empties = endgame_empties
+        self.endgame: Optional[EndgameSolver] = EndgameSolver() if endgame_empties > 0 else None
+        self.proven: Optional[int] = None
+        self.book = book
+        self.from_book = False
+        self.collect_stats = collect_stats
+        self.stats: Optional[SearchStats] = None
 
-    def alphabeta_value(self, state: TicTacToe, player: Player, alpha: int, beta: int, depth: int = 0) -> int:
+    def tt_key(self, state: Board, player: Player) -> Tuple[int, int]:
+        """Return (key, t): the table key for `state` and the transform to its stored frame.
+
+        Best moves are stored as symmetries(geo).transforms[t][move] and read
+        back through .inverse[t]; t is 0 (identity) when the plain Zobrist key is used.
+        """
+        if self.symmetry and (state.x_mask | state.o_mask).bit_count() <= self.SYMMETRY_MAX_STONES:
+            key, t = canonical_key(state)
+        else:
+            key, t = state.zkey, 0
+        # Values are scored with `player` as the maximiser, so the same position
+        # searched for the other player must not share an entry.
+        return (key if player == "X" else ~key), t
+
+    def alphabeta_value(self, state: Board, player: Player, alpha: int, beta: int, depth: int = 0) -> int:
         """Return the minimax value of `state` for `player` using alpha-beta pruning.
 
     
@@ -34,32 +118,94 @@ class AlphaBetaAI:
 
         # Safety check to check for infinite recursion. Game should never reach this depth in reality
         
+        self.nodes += 1
+        stats = self.stats
+        if stats is not None:
+            stats.node(depth + 1)
         if state.is_terminal():
+            if stats is not None:
+                stats.terminals += 1
             return state.outcome_value()
-            
+
+        # Children are searched by playing and taking back moves on one board.
+        if isinstance(state, TicTacToe):
+            state = SearchBoard(state)
+
+        tt = self.tt
+        moves = self.orderer.order(state, state.legal_moves(), depth)
+        # Every search here runs to the end of the game, so the depth below this
+        # node is simply the number of empty squares left.
+        remaining = len(moves)
+        if tt is not None:
+            key, t = self.tt_key(state, player)
+            entry = tt.probe(key)
+            if entry is not None:
+                if stats is not None:
+                    stats.tt_hits += 1
+                if entry.depth >= remaining:
+                    if entry.flag == EXACT:
+                        tt.cutoffs += 1
+                        return entry.value
+                    if entry.flag == LOWER:
+                        alpha = max(alpha, entry.value)
+                    else:
+                        beta = min(beta, entry.value)
+                    if alpha >= beta:
+                        tt.cutoffs += 1
+                        return entry.value
+                # try the move that was best last time first
+                if entry.best_move is not None:
+                    first = symmetries(state.geo).inverse[t][entry.best_move]
+                    moves.remove(first)
+                    moves.insert(0, first)
+            alpha_orig, beta_orig = alpha, beta
+
         next_player = state.next_player
+        best_move = None
 
         if next_player == player:  # maximiser (AI player)
             value = -2
-            for move in state.legal_moves():
-                child = state.apply(move)
-                val = self.alphabeta_value(child, player, alpha, beta, depth + 1)
-                value = max(value, val)
+            for i, move in enumerate(moves):
+                state.make(move)
+                val = self.alphabeta_value(state, player, alpha, beta, depth + 1)
+                state.unmake()
+                if val > value:
+                    value = val
+                    best_move = move
                 alpha = max(alpha, value)
                 if alpha >= beta:
+                    self.orderer.cutoff(state, move, depth, remaining)
+                    if stats is not None:
+                        stats.cutoff(i)
                     break
-            return value
-            
+
         else:  # minimiser (AI opponent)
             value = 2
-            for move in state.legal_moves():
-                child = state.apply(move)
-                val = self.alphabeta_value(child, player, alpha, beta, depth + 1)
-                value = min(value, val)
+            for i, move in enumerate(moves):
+                state.make(move)
+                val = self.alphabeta_value(state, player, alpha, beta, depth + 1)
+                state.unmake()
+                if val < value:
+                    value = val
+                    best_move = move
                 beta = min(beta, value)
                 if alpha >= beta:
+                    self.orderer.cutoff(state, move, depth, remaining)
+                    if stats is not None:
+                        stats.cutoff(i)
                     break
-            return value        
+
+        if tt is not None:
+            if value <= alpha_orig:
+                flag = UPPER
+            elif value >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if best_move is not None:
+                best_move = symmetries(state.geo).transforms[t][best_move]
+            tt.store(key, value, remaining, flag, best_move)
+        return value
 
     def best_move_alphabeta(self, state: TicTacToe, player: Player) -> Optional[Move]:
         """Return the best move for `player` from `state` using alpha-beta pruning.
@@ -80,9 +226,13 @@ class AlphaBetaAI:
         else:
             best_val = 2
 
-        for move in state.legal_moves():
-            child_state = state.apply(move)
-            val = self.alphabeta_value(child_state, player, alpha, beta)
+        moves = unique_moves(state) if self.symmetry else state.legal_moves()
+        moves = self.orderer.order(state, moves, 0)
+        board = SearchBoard(state)
+        for move in moves:
+            board.make(move)
+            val = self.alphabeta_value(board, player, alpha, beta)
+            board.unmake()
 
             if state.next_player == player:  # maximizer (AI's turn)
                 if val > best_val:
@@ -101,5 +251,236 @@ class AlphaBetaAI:
 
         return best_move
     
-    def choose_move(self, state: TicTacToe) -> Move:
-        return self.best_move_alphabeta(state, self.ai_player)
\ No newline at end of file
+    def alphabeta_limited(self, state: Board, player: Player, alpha: int, beta: int,
+                          depth_left: int, ply: int, on_pv: bool) -> int:
+        """Depth-limited alpha-beta used by the anytime search.
+
+        Scores are from `player`'s point of view: WIN_SCORE - ply for a win,
+        MinimaxAI.heuristic once `depth_left` reaches 0. While `on_pv` is true
+        this node lies on the previous iteration's best line, and that line's
+        move is searched first.
+        """
+        self._deadline.check()
+        self.nodes += 1
+        self._pv[ply] = []
+        sign = 1 if player == "X" else -1
+        stats = self.stats
+        if stats is not None:
+            stats.node(ply)
+
+        if state.is_terminal():
+            if stats is not None:
+                stats.terminals += 1
+            return sign * terminal_score(state, ply)
+        if depth_left == 0:
+            if stats is not None:
+                stats.evals += 1
+            return sign * MinimaxAI.heuristic(state)
+        if isinstance(state, TicTacToe):
+            state = SearchBoard(state)
+
+        moves = self.orderer.order(state, state.legal_moves(), ply)
+        tt = self.tt
+        first = None
+        if on_pv and ply < len(self._prev_pv):
+            first = self._prev_pv[ply]
+        if tt is not None:
+            key, t = self.tt_key(state, player)
+            key ^= _LIMITED_KEY
+            entry = tt.probe(key)
+            if entry is not None:
+                if stats is not None:
+                    stats.tt_hits += 1
+                if entry.depth >= depth_left and not on_pv:
+                    stored = from_tt(entry.value, ply)
+                    if entry.flag == EXACT:
+                        tt.cutoffs += 1
+                        return stored
+                    if entry.flag == LOWER:
+                        alpha = max(alpha, stored)
+                    else:
+                        beta = min(beta, stored)
+                    if alpha >= beta:
+                        tt.cutoffs += 1
+                        return stored
+                if first is None and entry.best_move is not None:
+                    first = symmetries(state.geo).inverse[t][entry.best_move]
+            alpha_orig, beta_orig = alpha, beta
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        else:
+            on_pv = False
+
+        best_move = None
+        maximising = state.next_player == player
+        value = -WIN_SCORE - 1 if maximising else WIN_SCORE + 1
+        for i, move in enumerate(moves):
+            state.make(move)
+            val = self.alphabeta_limited(state, player, alpha, beta,
+                                         depth_left - 1, ply + 1, on_pv and i == 0)
+            state.unmake()
+            if (val > value) if maximising else (val < value):
+                value = val
+                best_move = move
+                self._pv[ply] = [move] + self._pv[ply + 1]
+            if maximising:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                self.orderer.cutoff(state, move, ply, depth_left)
+                if stats is not None:
+                    stats.cutoff(i)
+                break
+
+        if tt is not None:
+            if value <= alpha_orig:
+                flag = UPPER
+            elif value >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if best_move is not None:
+                best_move = symmetries(state.geo).transforms[t][best_move]
+            tt.store(key, to_tt(value, ply), depth_left, flag, best_move)
+        return value
+
+    def best_move_timed(self, state: TicTacToe, player: Player, time_budget: Optional[float],
+                        max_depth: Optional[int] = None, deadline: Optional[Deadline] = None) -> Optional[Move]:
+        """Iterative deepening alpha-beta that stops after about `time_budget` seconds.
+
+        With time_budget=None it instead deepens until `max_depth` plies (or
+        the end of the game), which gives repeatable node counts. A
+        `deadline` given instead of time_budget is used as it is, so whoever
+        holds it can cancel() the search.
+
+        Depth 1 always completes so there is always a move to return. The
+        previous choice is searched first in every iteration, so when the
+        deadline cuts an iteration short, the best move it has found so far is
+        at least as good as the previous choice and is the one returned.
+        """
+        moves = unique_moves(state) if self.symmetry else state.legal_moves()
+        if not moves:
+            return None
+        moves = self.orderer.order(state, moves, 0)
+        maximising = state.next_player == player
+        if max_depth is None or max_depth > len(state.legal_moves()):
+            max_depth = len(state.legal_moves())
+
+        best_move = moves[0]
+        self._prev_pv = []
+        self.last_depth, self.last_score, self.last_pv = 0, 0, []
+        if deadline is None:
+            deadline = Deadline(time_budget)
+
+        for depth in range(1, max_depth + 1):
+            # the first iteration is tiny and must finish, whatever the budget
+            self._deadline = Deadline(None) if depth == 1 else deadline
+            if self._prev_pv:
+                moves.remove(self._prev_pv[0])
+                moves.insert(0, self._prev_pv[0])
+
+            alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+            iter_move: Optional[Move] = None
+            iter_score = alpha if maximising else beta
+            iter_pv: List[Move] = []
+            # a timeout can leave moves made on the board, so each iteration gets a fresh one
+            board = SearchBoard(state)
+            try:
+                for i, move in enumerate(moves):
+                    board.make(move)
+                    val = self.alphabeta_limited(board, player, alpha, beta,
+                                                 depth - 1, 1, i == 0)
+                    board.unmake()
+                    if (val > iter_score) if maximising else (val < iter_score):
+                        iter_score, iter_move = val, move
+                        iter_pv = [move] + self._pv[1]
+                        if maximising:
+                            alpha = val
+                        else:
+                            beta = val
+            except SearchTimeout:
+                if iter_move is not None:
+                    best_move, self.last_score, self.last_pv = iter_move, iter_score, iter_pv
+                break
+            finally:
+                self._deadline = Deadline(None)
+
+            best_move = iter_move if iter_move is not None else moves[0]
+            self.last_depth, self.last_score, self.last_pv = depth, iter_score, iter_pv
+            self._prev_pv = iter_pv
+            if is_proven(iter_score) or deadline.expired():
+                break
+
+        return best_move
+
+    def choose_move(self, state: TicTacToe, time_budget: Optional[float] = None,
+                    max_depth: Optional[int] = None, deadline: Optional[Deadline] = None) -> Move:
+        """Pick a move for the AI.
+
+        With none of the arguments this is a full alpha-beta search to the
+        end of the game. time_budget and/or max_depth switch to iterative
+        deepening. `deadline` can replace time_budget: the search then stops
+        when it runs out or when another thread cancel()s it.
+        """
+        if self.tt is not None:
+            self.tt.new_search()
+        self.prepare(state)
+        self.nodes = 0
+        move = self.book_move(state)
+        if move is not None:
+            return move
+        timed = time_budget is not None or max_depth is not None or deadline is not None
+        if deadline is None:
+            deadline = Deadline(time_budget)
+        move = self.solve_endgame(state, deadline)
+        if move is not None:
+            return move
+        if timed:
+            move = self.best_move_timed(state, self.ai_player, None, max_depth, deadline)
+            if is_proven(self.last_score) and self.last_score > 0:
+                self.proven = 1
+            return move
+        return self.best_move_alphabeta(state, self.ai_player)
+
+    def prepare(self, state: TicTacToe) -> None:
+        """Clear killers/history and size the per-ply tables for `state`'s board."""
+        n_cells = state.geo.n_cells
+        self.orderer.reset(n_cells)
+        self.stats = SearchStats() if self.collect_stats else None
+        if len(self._pv) != n_cells + 2:
+            self._pv = [[] for _ in range(n_cells + 2)]
+
+    def book_move(self, state: TicTacToe) -> Optional[Move]:
+        """The book move for `state` (filling in last_depth etc.), or None."""
+        self.from_book = False
+        hit = None if self.book is None else self.book.probe(state)
+        if hit is None:
+            return None
+        move, depth, score = hit
+        self.from_book = True
+        self.last_depth, self.last_score, self.last_pv = depth, score, [move]
+        self.proven = 1 if is_proven(score) and score > 0 else None
+        return move
+
+    def solve_endgame(self, state: TicTacToe, deadline: Deadline) -> Optional[Move]:
+        """Solve `state` exactly if few enough squares are empty.
+
+        Returns the move to play and sets `proven`, or returns None (with
+        `proven` None) if the position is too big or `deadline` ran out.
+        """
+        self.proven = None
+        empties = len(state.legal_moves())
+        if self.endgame is None or empties > self.endgame_empties or state.is_terminal():
+            return None
+        try:
+            value, move = self.endgame.solve(state, deadline)
+        except SearchTimeout:
+            return None
+        finally:
+            self.nodes += self.endgame.nodes
+        # the solver scores for the player to move
+        self.proven = value if state.next_player == self.ai_player else -value
+        self.last_depth, self.last_score, self.last_pv = empties, self.proven * WIN_SCORE, [move]
+        return move
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""Monte Carlo Tree Search (UCT) engine for n x n Tic-Tac-Toe.
+
+Instead of searching every line to a fixed depth, MCTS grows a tree one
+node per iteration:
+  1. selection: from the root, follow the child with the best UCT score
+     (win rate + exploration * sqrt(ln(parent visits) / child visits))
+     until reaching a node with untried moves;
+  2. expansion: add one untried move as a new child;
+  3. playout: play random moves from there to the end of the game;
+  4. backpropagation: credit the result to every node on the path.
+The move played is the root child visited most.
+
+Playouts work on the two bitboards directly: the empty squares are shuffled
+once and played in that order, checking only the lines through each new
+stone, so no game objects are created. Tree nodes use __slots__.
+
+With workers > 1 the root is parallelised: each process grows its own tree
+with a different random seed, and the root visit counts are added up.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from tictactoe import Move, Player, SearchBoard, TicTacToe, geometry
+from anytime import Deadline
+
+
+class Node:
+    """One position in the search tree.
+
+    `wins` is scored for the player who made `move` (1 per win, 0.5 per
+    draw), which is the player choosing between this node and its siblings.
+    """
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: Optional[Move], parent: Optional["Node"], untried: List[Move]) -> None:
+        self.move = move
+        self.parent = parent
+        self.children: List[Node] = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration: float) -> "Node":
+        log_n = math.log(self.visits)
+        return max(self.children,
+                   key=lambda c: c.wins / c.visits + exploration * math.sqrt(log_n / c.visits))
+
+
+def playout(x_mask: int, o_mask: int, player: Player, empties: List[Move], rng: random.Random,
+            cell_masks: Tuple[Tuple[int, ...], ...]) -> Optional[Player]:
+    """Finish the game with random moves; return the winner (None for a draw).
+
+    cell_masks[i] are the win-line masks through square i (Geometry.cell_masks).
+    """
+    rng.shuffle(empties)
+    for move in empties:
+        bit = 1 << move
+        if player == "X":
+            x_mask |= bit
+            mine = x_mask
+        else:
+            o_mask |= bit
+            mine = o_mask
+        for m in cell_masks[move]:
+            if mine & m == m:
+                return player
+        player = "O" if player == "X" else "X"
+    return None
+
+
+def run_mcts(state: TicTacToe, iterations: Optional[int], seconds: Optional[float],
+             exploration: float, seed: Optional[int]) -> Dict[Move, int]:
+    """Grow one tree from `state`; return the visit count of each root move.
+
+    Stops after `iterations` iterations or `seconds` seconds, whichever comes
+    first (at least one of them must be given).
+    """
+    rng = random.Random(seed)
+    deadline = Deadline(seconds)
+    root = Node(None, None, state.legal_moves())
+    board = SearchBoard(state)
+    done = 0
+    while iterations is None or done < iterations:
+        if done % 64 == 0 and deadline.expired():
+            break
+        done += 1
+        node = root
+        path = 0
+
+        # selection
+        while not node.untried and node.children:
+            node = node.select_child(exploration)
+            board.make(node.move)
+            path += 1
+
+        # expansion
+        if node.untried and not board.is_terminal():
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            board.make(move)
+            path += 1
+            child = Node(move, node, [] if board.is_terminal() else board.legal_moves())
+            node.children.append(child)
+            node = child
+
+        # playout
+        if board.is_terminal():
+            winner = board.won_by
+        else:
+            winner = playout(board.x_mask, board.o_mask, board.next_player, board.legal_moves(), rng,
+                             state.geo.cell_masks)
+
+        # backpropagation: the player who moved into `node` is the one who
+        # just moved on the board; alternate going up
+        mover = "O" if board.next_player == "X" else "X"
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == mover:
+                node.wins += 1.0
+            mover = "O" if mover == "X" else "X"
+            node = node.parent
+        for _ in range(path):
+            board.unmake()
+
+    return {child.move: child.visits for child in root.children}
+
+
+def _run_worker(n: int, k: int, x_mask: int, o_mask: int, next_player: Player, iterations: Optional[int],
+                seconds: Optional[float], exploration: float, seed: Optional[int]) -> Dict[Move, int]:
+    state = TicTacToe.from_masks(x_mask, o_mask, next_player, geometry(n, k))
+    return run_mcts(state, iterations, seconds, exploration, seed)
+
+
+class MCTSAI:
+    """UCT Monte Carlo Tree Search player.
+
+    choose_move(state, time_budget=None, iterations=None) searches for
+    `iterations` iterations (default self.iterations) or `time_budget`
+    seconds, whichever runs out first. With workers > 1 that many trees are
+    grown in parallel processes (each with the full budget) and their root
+    visit counts merged; call close() or use a `with` block to stop the pool.
+    `last_visits` holds the merged root visit counts of the last move and
+    `nodes` their total, i.e. the iterations (playouts) it ran.
+    """
+
+    def __init__(self, ai_player: Player = "X", exploration: float = math.sqrt(2),
+                 iterations: int = 20000, workers: int = 1, seed: Optional[int] = None) -> None:
+        self.ai_player = ai_player
+        self.exploration = exploration
+        self.iterations = iterations
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.last_visits: Dict[Move, int] = {}
+        self.nodes = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "MCTSAI":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def choose_move(self, state: TicTacToe, time_budget: Optional[float] = None,
+                    iterations: Optional[int] = None) -> Move:
+        if state.is_terminal():
+            raise ValueError("Game is already over.")
+        if state.next_player != self.ai_player:
+            raise ValueError("It is not the AI's turn.")
+        if iterations is None and time_budget is None:
+            iterations = self.iterations
+
+        seeds = [self.rng.getrandbits(32) for _ in range(max(1, self.workers))]
+        if self.workers > 1:
+            futures = [self.pool().submit(_run_worker, state.geo.n, state.geo.k, state.x_mask, state.o_mask,
+                                          state.next_player, iterations, time_budget, self.exploration, seed)
+                       for seed in seeds]
+            results = [f.result() for f in futures]
+        else:
+            results = [run_mcts(state, iterations, time_budget, self.exploration, seeds[0])]
+
+        visits: Dict[Move, int] = {}
+        for result in results:
+            for move, n in result.items():
+                visits[move] = visits.get(move, 0) + n
+        self.last_visits = visits
+        self.nodes = sum(visits.values())
+        # most visited; ties go to the lower square so the choice is repeatable
+        return max(sorted(visits), key=visits.__getitem__)
@@ -0,0 +1,234 @@
+"""Negamax / Principal Variation Search engine for 5x5 Tic-Tac-Toe.
+
+AlphaBetaAI keeps separate maximiser and minimiser branches. PVSAI uses
+negamax instead: every score is from the point of view of the player to
+move, so one branch serves both sides and a child's score is just the
+negation of its parent's.
+
+On top of that:
+  - Principal variation search: the first move at each node (the best from
+    the previous iteration / transposition table) gets the full window. Every
+    other move is first searched with a null window (alpha, alpha + 1), which
+    only proves it is no better. It is re-searched with the full window only
+    if that proof fails.
+  - Aspiration windows: each iteration of the iterative deepening starts
+    with a window of +-ASPIRATION around the previous iteration's score and
+    widens it if the true score falls outside.
+  - Pluggable evaluation: `evaluate` is any function scoring a non-terminal
+    position from X's point of view (MinimaxAI.heuristic by default). Its
+    scores must stay below WIN_SCORE / 2 in size so wins still outrank them.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Optional
+
+from tictactoe import N_CELLS, Board, SearchBoard, TicTacToe, Move, Player
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from symmetry import canonical_key, symmetries, unique_moves
+from ai_minimax import MinimaxAI
+from move_ordering import make_orderer
+from anytime import WIN_SCORE, Deadline, SearchTimeout, from_tt, is_proven, to_tt
+from search_stats import SearchStats
+
+
+Evaluator = Callable[[Board], int]
+
+INFINITY = WIN_SCORE + 1
+
+
+class PVSAI:
+    """Iterative-deepening negamax with PVS and aspiration windows.
+
+    choose_move(state, time_budget=seconds, max_depth=plies) works like
+    AlphaBetaAI's timed search; with neither it searches to the end of the
+    game. After a move, last_depth, last_score (for the AI) and last_pv hold
+    the deepest completed iteration, `nodes` the positions searched and
+    `researches` how many PVS / aspiration re-searches were needed. With
+    `collect_stats` on, `stats` holds a SearchStats for the last move.
+    """
+
+    ASPIRATION = 100
+    SYMMETRY_MAX_STONES = 9
+
+    def __init__(self, ai_player: Player = "X", evaluate: Evaluator = MinimaxAI.heuristic,
+                 tt_size: int = 1 << 20, ordering: str = "all", collect_stats: bool = False) -> None:
+        self.ai_player = ai_player
+        self.evaluate = evaluate
+        self.orderer = make_orderer(ordering)
+        self.tt: Optional[TranspositionTable] = TranspositionTable(tt_size) if tt_size > 0 else None
+        self.nodes = 0
+        self.researches = 0
+        self.last_depth = 0
+        self.last_score = 0
+        self.last_pv: List[Move] = []
+        self.collect_stats = collect_stats
+        self.stats: Optional[SearchStats] = None
+        self._deadline = Deadline(None)
+        self._pv: List[List[Move]] = [[] for _ in range(N_CELLS + 2)]
+
+    def negamax(self, state: SearchBoard, alpha: int, beta: int, depth_left: int, ply: int) -> int:
+        """Score of `state` for the player to move, searched `depth_left` plies deep."""
+        self._deadline.check()
+        self.nodes += 1
+        self._pv[ply] = []
+        stats = self.stats
+        if stats is not None:
+            stats.node(ply)
+        if state.won_by is not None or state.empty_mask() == 0:
+            if stats is not None:
+                stats.terminals += 1
+            # a win for the player who just moved, or a draw
+            return 0 if state.won_by is None else -(WIN_SCORE - ply)
+        if depth_left == 0:
+            if stats is not None:
+                stats.evals += 1
+            value = self.evaluate(state)
+            return value if state.next_player == "X" else -value
+
+        moves = self.orderer.order(state, state.legal_moves(), ply)
+        tt = self.tt
+        if tt is not None:
+            # like AlphaBetaAI.tt_key: symmetric copies share entries early on
+            if (state.x_mask | state.o_mask).bit_count() <= self.SYMMETRY_MAX_STONES:
+                key, t = canonical_key(state)
+            else:
+                key, t = state.zkey, 0
+            entry = tt.probe(key)
+            if entry is not None:
+                if stats is not None:
+                    stats.tt_hits += 1
+                if entry.depth >= depth_left:
+                    value = from_tt(entry.value, ply)
+                    if entry.flag == EXACT:
+                        tt.cutoffs += 1
+                        return value
+                    if entry.flag == LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if alpha >= beta:
+                        tt.cutoffs += 1
+                        return value
+                if entry.best_move is not None:
+                    first = symmetries(state.geo).inverse[t][entry.best_move]
+                    moves.remove(first)
+                    moves.insert(0, first)
+        # after the table may have narrowed the window: the flag stored
+        # below is about this search's window
+        alpha_orig, beta_orig = alpha, beta
+
+        best = -INFINITY
+        best_move = None
+        for i, move in enumerate(moves):
+            state.make(move)
+            if i == 0:
+                value = -self.negamax(state, -beta, -alpha, depth_left - 1, ply + 1)
+            else:
+                value = -self.negamax(state, -alpha - 1, -alpha, depth_left - 1, ply + 1)
+                if alpha < value < beta:
+                    self.researches += 1
+                    value = -self.negamax(state, -beta, -alpha, depth_left - 1, ply + 1)
+            state.unmake()
+            if value > best:
+                best = value
+                best_move = move
+                self._pv[ply] = [move] + self._pv[ply + 1]
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        self.orderer.cutoff(state, move, ply, depth_left)
+                        if stats is not None:
+                            stats.cutoff(i)
+                        break
+
+        if tt is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if best_move is not None:
+                best_move = symmetries(state.geo).transforms[t][best_move]
+            tt.store(key, to_tt(best, ply), depth_left, flag, best_move)
+        return best
+
+    def search_root(self, board: SearchBoard, moves: List[Move], depth: int,
+                    alpha: int, beta: int) -> int:
+        """One iteration over the root `moves`; the best line ends up in _pv[0]."""
+        self.nodes += 1
+        self._pv[0] = []
+        best = -INFINITY
+        for i, move in enumerate(moves):
+            board.make(move)
+            if i == 0:
+                value = -self.negamax(board, -beta, -alpha, depth - 1, 1)
+            else:
+                value = -self.negamax(board, -alpha - 1, -alpha, depth - 1, 1)
+                if alpha < value < beta:
+                    self.researches += 1
+                    value = -self.negamax(board, -beta, -alpha, depth - 1, 1)
+            board.unmake()
+            if value > best:
+                best = value
+                self._pv[0] = [move] + self._pv[1]
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+        return best
+
+    def choose_move(self, state: TicTacToe, time_budget: Optional[float] = None,
+                    max_depth: Optional[int] = None) -> Move:
+        if state.is_terminal():
+            raise ValueError("Game is already over.")
+        if state.next_player != self.ai_player:
+            raise ValueError("It is not the AI's turn.")
+        if self.tt is not None:
+            self.tt.new_search()
+        self.orderer.reset(state.geo.n_cells)
+        if len(self._pv) != state.geo.n_cells + 2:
+            self._pv = [[] for _ in range(state.geo.n_cells + 2)]
+        self.nodes = 0
+        self.researches = 0
+        self.stats = SearchStats() if self.collect_stats else None
+
+        moves = self.orderer.order(state, unique_moves(state), 0)
+        if max_depth is None or max_depth > len(state.legal_moves()):
+            max_depth = len(state.legal_moves())
+        deadline = Deadline(time_budget)
+        best_move = moves[0]
+        score = 0
+        self.last_depth, self.last_score, self.last_pv = 0, 0, []
+
+        for depth in range(1, max_depth + 1):
+            # the first iteration is tiny and must finish, whatever the budget
+            self._deadline = Deadline(None) if depth == 1 else deadline
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            board = SearchBoard(state)
+            try:
+                if depth == 1 or is_proven(score):
+                    alpha, beta = -INFINITY, INFINITY
+                else:
+                    alpha, beta = score - self.ASPIRATION, score + self.ASPIRATION
+                while True:
+                    value = self.search_root(board, moves, depth, alpha, beta)
+                    if value <= alpha and alpha > -INFINITY:
+                        alpha = -INFINITY  # failed low: open the window downwards
+                    elif value >= beta and beta < INFINITY:
+                        beta = INFINITY  # failed high: open it upwards
+                    else:
+                        break
+                    self.researches += 1
+            except SearchTimeout:
+                break
+            finally:
+                self._deadline = Deadline(None)
+
+            score = value
+            best_move = self._pv[0][0]
+            self.last_depth, self.last_score, self.last_pv = depth, score, list(self._pv[0])
+            if is_proven(score) or deadline.expired():
+                break
+        return best_move
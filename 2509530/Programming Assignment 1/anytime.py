@@ -0,0 +1,82 @@
+"""Support for time-limited (anytime) search.
+
+A depth-limited search scores positions at its horizon with the heuristic, whose
+values run into the hundreds, so a finished game has to be worth more than any
+heuristic score. Wins are scored WIN_SCORE - ply: winning sooner is better and
+losing later is less bad.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+# WIN_SCORE is defined with the board, since geometry() checks that every
+# board's heuristic stays below WIN_SCORE // 2.
+from tictactoe import WIN_SCORE, TicTacToe
+
+
+def terminal_score(state: TicTacToe, ply: int) -> int:
+    """Score of a finished game from X's point of view, `ply` moves below the root."""
+    return state.outcome_value() * (WIN_SCORE - ply)
+
+
+def is_proven(score: int) -> bool:
+    """True if `score` comes from a forced win/loss rather than the heuristic."""
+    return abs(score) > WIN_SCORE // 2
+
+
+def to_tt(score: int, ply: int) -> int:
+    """Make a win score relative to the node it is stored at, not the root.
+
+    A transposition table outlives one search and is probed at other plies,
+    so a stored WIN_SCORE - ply would give the wrong distance to the win.
+    """
+    if is_proven(score):
+        return score + ply if score > 0 else score - ply
+    return score
+
+
+def from_tt(score: int, ply: int) -> int:
+    """Inverse of to_tt(): a stored score seen from `ply` plies below the root."""
+    if is_proven(score):
+        return score - ply if score > 0 else score + ply
+    return score
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget has run out."""
+
+
+class Deadline:
+    """Wall-clock limit for a search.
+
+    check() is called once per node; it only reads the clock every
+    CHECK_EVERY calls so the overhead stays small. A Deadline built with
+    seconds=None never expires.
+    """
+
+    CHECK_EVERY = 256
+
+    def __init__(self, seconds: Optional[float]) -> None:
+        self.end = None if seconds is None else time.perf_counter() + seconds
+        self.calls = 0
+
+    def check(self) -> None:
+        if self.end is None:
+            return
+        self.calls += 1
+        if self.calls % self.CHECK_EVERY == 0 and time.perf_counter() >= self.end:
+            raise SearchTimeout()
+
+    def cancel(self) -> None:
+        """Make the deadline run out now. Another thread may call this to stop
+        a search; it raises SearchTimeout within CHECK_EVERY nodes."""
+        self.end = 0.0
+
+    def expired(self) -> bool:
+        return self.end is not None and time.perf_counter() >= self.end
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None for no limit."""
+        return None if self.end is None else max(0.0, self.end - time.perf_counter())
@@ -0,0 +1,100 @@
+"""Batched heuristic evaluation with NumPy.
+
+MinimaxAI.heuristic() scores one position at a time. At the search horizon
+every child of a node is a leaf, so they can all be scored in one call
+instead: the children are stacked into an (N, squares) int8 array (1 = X,
+-1 = O, 0 = empty) and multiplied by a squares x lines membership matrix
+(25 x 48 on the 5x5 board), giving the number of X's and O's on every line
+of every board at once. The per-line scores then come from the same
+Geometry.line_score table the scalar heuristic uses, so the two always agree.
+
+NumPy is optional: the rest of the project runs without it, and
+require_numpy() gives a clear error when batched evaluation is asked for
+and NumPy is not installed.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # batched evaluation is simply unavailable
+    np = None
+
+from tictactoe import DEFAULT_GEOMETRY, Board, Geometry, Move
+from anytime import WIN_SCORE
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError("Batched evaluation needs NumPy (pip install numpy).")
+
+
+@lru_cache(maxsize=None)
+def line_tables(geo: Geometry) -> Tuple["np.ndarray", "np.ndarray"]:
+    """(lines, line_scores) for one board.
+
+    lines[i, j] is 1 when square i is on geo.win_lines[j]; line_scores is
+    geo.line_score as an array.
+    """
+    require_numpy()
+    lines = np.zeros((geo.n_cells, len(geo.win_lines)), dtype=np.int8)
+    for j, line in enumerate(geo.win_lines):
+        lines[list(line), j] = 1
+    return lines, np.array(geo.line_score, dtype=np.int32)
+
+
+def encode(state: Board) -> "np.ndarray":
+    """One int8 per square: 1 for X, -1 for O, 0 for empty."""
+    n_cells = state.geo.n_cells
+    board = np.zeros(n_cells, dtype=np.int8)
+    x, o = state.x_mask, state.o_mask
+    for i in range(n_cells):
+        if x >> i & 1:
+            board[i] = 1
+        elif o >> i & 1:
+            board[i] = -1
+    return board
+
+
+def children(state: Board, moves: Sequence[Move]) -> "np.ndarray":
+    """(len(moves), squares) array of the positions after each move in `moves`."""
+    batch = np.repeat(encode(state)[None, :], len(moves), axis=0)
+    batch[np.arange(len(moves)), list(moves)] = 1 if state.next_player == "X" else -1
+    return batch
+
+
+def evaluate_batch(boards: "np.ndarray", ply: Optional[int] = None,
+                   geo: Geometry = DEFAULT_GEOMETRY) -> "np.ndarray":
+    """Score every row of an (N, squares) int8 board array like MinimaxAI.heuristic().
+
+    A board with k X's in a line scores +1, k O's -1, a full board with
+    neither 0, and anything else the sum of geo.line_score over its lines.
+    Given `ply`, wins score like anytime.terminal_score() instead
+    (WIN_SCORE - ply). Each board is assumed to have at most one winner, as
+    in a real game.
+    """
+    require_numpy()
+    lines, line_scores = line_tables(geo)
+    boards = np.asarray(boards, dtype=np.int8)
+    x_counts = (boards == 1).astype(np.int8) @ lines
+    o_counts = (boards == -1).astype(np.int8) @ lines
+    x_won = (x_counts == geo.k).any(axis=1)
+    o_won = (o_counts == geo.k).any(axis=1)
+    full = (boards != 0).all(axis=1)
+    win = 1 if ply is None else WIN_SCORE - ply
+
+    codes = x_counts.astype(np.int32) + (geo.k + 1) * o_counts.astype(np.int32)
+    scores = line_scores[codes].sum(axis=1)
+    scores[full] = 0
+    scores[o_won] = -win
+    scores[x_won] = win
+    return scores
+
+
+def evaluate_children(state: Board, moves: Sequence[Move], ply: Optional[int] = None) -> List[int]:
+    """evaluate_batch() of each child of `state`, in the order of `moves`."""
+    require_numpy()
+    return evaluate_batch(children(state, moves), ply, state.geo).tolist()
@@ -0,0 +1,197 @@
+"""Benchmark suite: every engine on a fixed set of positions.
+
+benchmark.time_ai() only times the empty board. This suite times each
+registered engine on an opening, midgame and endgame position of both the
+3x3 and the 5x5 board, with warmup runs and repeated trials, and reports
+the median time, its interquartile range (IQR) and nodes per second.
+
+Results can be saved as JSON and compared against an earlier run (the
+baseline); any engine/position whose median got slower by more than
+--threshold is flagged as a regression and the exit status is 1:
+
+    python bench_suite.py --out baseline.json
+    ... change something ...
+    python bench_suite.py --baseline baseline.json
+
+Every trial builds a fresh engine, so transposition tables and move-ordering
+history from one trial do not speed up the next. New engines only need an
+entry in ENGINES.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tictactoe import Player, TicTacToe
+from ai_minimax import MinimaxAI
+from ai_alphabeta_stub import AlphaBetaAI
+from ai_pvs import PVSAI
+from ai_mcts import MCTSAI
+from latency import percentile
+
+
+@dataclass
+class Position:
+    name: str
+    n: int
+    k: int
+    moves: Tuple[int, ...]  # played from the empty board
+
+    def state(self) -> TicTacToe:
+        state = TicTacToe.new(self.n, self.k)
+        for move in self.moves:
+            state = state.apply(move)
+        return state
+
+
+CORPUS: List[Position] = [
+    Position("3x3 opening", 3, 3, ()),
+    Position("3x3 midgame", 3, 3, (6, 7, 0)),
+    Position("3x3 endgame", 3, 3, (6, 7, 0, 3, 8)),
+    Position("5x5 opening", 5, 3, ()),
+    Position("5x5 centre", 5, 3, (12,)),
+    Position("5x5 midgame", 5, 3, (5, 23, 24, 15, 21, 2, 4, 20)),
+    Position("5x5 endgame", 5, 3, (1, 3, 4, 14, 8, 12, 13, 10, 11, 9, 19, 21, 20)),
+]
+
+
+ENDGAME_EMPTIES = 14  # AlphaBetaAI's default endgame_empties
+
+
+@dataclass
+class Engine:
+    """How to build an engine for a player and what to pass to choose_move()."""
+
+    factory: Callable[[Player], object]
+    settings: Dict[str, object] = field(default_factory=dict)
+    max_empties: Optional[int] = None  # only run on positions with at most this many empty squares
+
+
+# Fixed depths / iteration counts rather than time budgets, so every trial
+# does the same work and only the speed varies. AlphaBetaAI hands positions
+# with few empty squares to its EndgameSolver, so "alpha-beta" turns that off
+# to always time the iterative search, and "endgame" times the solver alone.
+ENGINES: Dict[str, Engine] = {
+    "minimax": Engine(lambda p: MinimaxAI(ai_player=p), {"max_depth": 3}),
+    "alpha-beta": Engine(lambda p: AlphaBetaAI(ai_player=p, endgame_empties=0), {"max_depth": 5}),
+    "endgame": Engine(lambda p: AlphaBetaAI(ai_player=p, endgame_empties=ENDGAME_EMPTIES), {"max_depth": 5},
+                      max_empties=ENDGAME_EMPTIES),
+    "pvs": Engine(lambda p: PVSAI(ai_player=p), {"max_depth": 5}),
+    "mcts": Engine(lambda p: MCTSAI(ai_player=p, seed=0), {"iterations": 2000}),
+}
+
+
+def measure(engine: Engine, position: Position, trials: int, warmup: int) -> Dict[str, float]:
+    """Time `trials` searches of `position` (after `warmup` untimed ones)."""
+    state = position.state()
+    times: List[float] = []
+    nodes: List[int] = []
+    for i in range(warmup + trials):
+        ai = engine.factory(state.next_player)
+        start = time.perf_counter()
+        ai.choose_move(state, **engine.settings)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+            nodes.append(getattr(ai, "nodes", 0))
+    median = percentile(times, 50)
+    node_count = int(percentile(nodes, 50))
+    return {
+        "median": median,
+        "iqr": percentile(times, 75) - percentile(times, 25),
+        "min": min(times),
+        "nodes": node_count,
+        "nps": node_count / median if median > 0 else 0.0,
+    }
+
+
+def run_suite(engines: List[str], trials: int = 5, warmup: int = 1) -> Dict[str, object]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name in engines:
+        for position in CORPUS:
+            limit = ENGINES[name].max_empties
+            if limit is not None and len(position.state().legal_moves()) > limit:
+                continue
+            results[f"{name} / {position.name}"] = measure(ENGINES[name], position, trials, warmup)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "trials": trials,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def regressions(current: Dict[str, object], baseline: Dict[str, object],
+                threshold: float) -> List[Tuple[str, float, float]]:
+    """(case, baseline median, current median) for every case more than
+    `threshold` (0.1 = 10%) slower than in `baseline`."""
+    out = []
+    base = baseline["results"]
+    for case, r in current["results"].items():
+        if case in base and r["median"] > base[case]["median"] * (1 + threshold):
+            out.append((case, base[case]["median"], r["median"]))
+    return out
+
+
+def print_results(suite: Dict[str, object], baseline: Optional[Dict[str, object]] = None) -> None:
+    base = baseline["results"] if baseline else {}
+    print(f"  {'case':<26} {'median (s)':>10} {'IQR (s)':>9} {'nodes':>8} {'nodes/s':>10} {'vs base':>8}")
+    for case, r in suite["results"].items():
+        change = ""
+        if case in base and base[case]["median"] > 0:
+            change = f"{r['median'] / base[case]['median'] - 1:+.0%}"
+        print(f"  {case:<26} {r['median']:>10.5f} {r['iqr']:>9.5f} {r['nodes']:>8} "
+              f"{r['nps']:>10,.0f} {change:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time every engine on a fixed set of positions.")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help=f"comma-separated engines to run (default: {','.join(ENGINES)})")
+    parser.add_argument("--trials", type=int, default=5, help="timed runs per engine and position")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs first")
+    parser.add_argument("--out", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --out")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.engines.split(",") if n.strip()]
+    unknown = [n for n in names if n not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engine(s) {', '.join(unknown)}; choose from {', '.join(ENGINES)}")
+
+    suite = run_suite(names, args.trials, args.warmup)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print(f"{args.trials} trials after {args.warmup} warmup run(s):")
+    print_results(suite, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(suite, f, indent=2)
+        print(f"\nResults written to {args.out}")
+    if baseline is not None:
+        slower = regressions(suite, baseline, args.threshold)
+        if slower:
+            print(f"\nRegressions (more than {args.threshold:.0%} slower than {args.baseline}):")
+            for case, before, after in slower:
+                print(f"  {case}: {before:.5f} s -> {after:.5f} s")
+            sys.exit(1)
+        print(f"\nNo regressions above {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,285 @@
 from __future__ import annotations
 
+import argparse
+import os
+import random
 import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
-from tictactoe import TicTacToe
+from tictactoe import DEFAULT_GEOMETRY, TicTacToe, geometry
 from ai_minimax import MinimaxAI
 from ai_alphabeta_stub import AlphaBetaAI
+from ai_pvs import PVSAI
+from move_ordering import ORDERINGS
+from parallel_search import ParallelAlphaBetaAI
+from latency import LatencyRecorder
+import batch_eval
 
 
-def time_ai(ai, n: int = 1) -> float:
-    """Average time per move (seconds) from the initial position.
+# Positions for comparing move orderings, as the moves played from the empty
+# board. The 5x5 game is very sharp, so these were picked because a depth-5
+# search does not simply find a forced win.
+ORDERING_POSITIONS = {
+    "opening":   (),
+    "centre":    (12,),
+    "midgame A": (5, 23, 24, 15, 21, 2, 4, 20),
+    "midgame B": (23, 0, 4, 10, 6, 19),
+}
 
-    For a fair comparison we time `choose_move()` repeatedly from the same state.
+# Board the comparisons run on; main() changes it for --size / --k.
+BOARD = DEFAULT_GEOMETRY
+
+
+def positions() -> Dict[str, Tuple[int, ...]]:
+    """ORDERING_POSITIONS on the 5x5 board; the empty board and the centre
+    opening on any other."""
+    if BOARD is DEFAULT_GEOMETRY:
+        return ORDERING_POSITIONS
+    return {"opening": (), "centre": (BOARD.n_cells // 2,)}
+
+
+def time_ai(make_ai: Callable[[], object], n: int = 1, state: Optional[TicTacToe] = None,
+            **kwargs) -> Tuple[float, object]:
+    """Average time per move (seconds) from `state` (default: the empty board),
+    and the engine used for the last run.
+
+    Every run gets a fresh engine from `make_ai()` (built outside the timing),
+    so a transposition table filled by one run cannot answer the next.
+    Extra keyword arguments (e.g. max_depth=...) are passed to choose_move().
     """
-    state = TicTacToe.new()
-    start = time.perf_counter()
+    if state is None:
+        state = play(())
+    total = 0.0
+    ai = None
     for _ in range(n):
-        _ = ai.choose_move(state)
-    end = time.perf_counter()
-    return (end - start) / n
+        ai = make_ai()
+        start = time.perf_counter()
+        ai.choose_move(state, **kwargs)
+        total += time.perf_counter() - start
+    return total / n, ai
+
+
+def play(moves: Sequence[int]) -> TicTacToe:
+    state = TicTacToe.new(BOARD.n, BOARD.k)
+    for mv in moves:
+        state = state.apply(mv)
+    return state
+
+
+def minimal_tree_nodes(empties: int, depth: int) -> int:
+    """Nodes below the root in the Knuth-Moore minimal alpha-beta tree.
+
+    This is the best case for perfect move ordering when every node at ply k
+    has empties - k children and no game ends early. Forced wins cut the real
+    tree shorter, so a search can come in under it.
+    """
+    total = 0
+    for k in range(1, depth + 1):
+        even = odd = 1
+        for i in range(k):
+            if i % 2 == 0:
+                even *= empties - i
+            else:
+                odd *= empties - i
+        total += even + odd - 1
+    return total
+
+
+def compare_orderings(depth: int = 5) -> None:
+    """Nodes and time per move for each move ordering on positions().
+
+    The transposition table is switched off so only the ordering differs.
+    Minimal is the sum of minimal_tree_nodes() over the iterations searched.
+    """
+    print(f"Move ordering, iterative deepening to depth {depth}, no transposition table:")
+    print(f"  {'position':<10} {'ordering':<9} {'nodes':>8} {'minimal':>8} {'time (s)':>9}")
+    for label, moves in positions().items():
+        state = play(moves)
+        for name in ORDERINGS:
+            ai = AlphaBetaAI(ai_player=state.next_player, tt_size=0, ordering=name)
+            start = time.perf_counter()
+            ai.choose_move(state, max_depth=depth)
+            elapsed = time.perf_counter() - start
+            empties = len(state.legal_moves())
+            minimal = sum(minimal_tree_nodes(empties, d) for d in range(1, ai.last_depth + 1))
+            print(f"  {label:<10} {name:<9} {ai.nodes:>8} {minimal:>8} {elapsed:>9.4f}")
+    print()
+
+
+def compare_engines(depth: int = 4) -> None:
+    """Minimax, alpha-beta and PVS searching positions() to the same depth.
+
+    All three use MinimaxAI.heuristic at the horizon. The move chosen may
+    differ between engines when several moves have the same score. Each
+    engine's SearchStats summary is printed under its row.
+    """
+    print(f"Engines, iterative deepening to depth {depth}:")
+    print(f"  {'position':<10} {'engine':<10} {'nodes':>8} {'time (s)':>9} {'move':>5}")
+    for label, moves in positions().items():
+        state = play(moves)
+        player = state.next_player
+        for name, ai in (("minimax", MinimaxAI(ai_player=player, collect_stats=True)),
+                         ("alpha-beta", AlphaBetaAI(ai_player=player, collect_stats=True)),
+                         ("pvs", PVSAI(ai_player=player, collect_stats=True))):
+            start = time.perf_counter()
+            move = ai.choose_move(state, max_depth=depth)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<10} {name:<10} {ai.nodes:>8} {elapsed:>9.4f} {move:>5}")
+            print(f"    {ai.stats.summary()}")
+    print()
+
+
+def compare_parallel(workers: int, depth: int = 5) -> None:
+    """Serial vs root-split parallel alpha-beta on positions().
+
+    Both search to the same fixed depth so they do the same job; speedup is
+    serial time / parallel time. The worker pool is started before timing.
+    """
+    print(f"Parallel root split with {workers} workers ({os.cpu_count()} CPUs), depth {depth}:")
+    print(f"  {'position':<10} {'serial (s)':>10} {'parallel (s)':>12} {'speedup':>8} {'same move':>9}")
+    pools = {p: ParallelAlphaBetaAI(ai_player=p, workers=workers) for p in ("X", "O")}
+    try:
+        for ai in pools.values():
+            ai.choose_move(play(()), max_depth=1)  # start the worker processes
+        for label, moves in positions().items():
+            state = play(moves)
+            serial = AlphaBetaAI(ai_player=state.next_player)
+            start = time.perf_counter()
+            m1 = serial.choose_move(state, max_depth=depth)
+            t1 = time.perf_counter() - start
+            start = time.perf_counter()
+            m2 = pools[state.next_player].choose_move(state, max_depth=depth)
+            t2 = time.perf_counter() - start
+            print(f"  {label:<10} {t1:>10.4f} {t2:>12.4f} {t1 / t2:>7.2f}x {str(m1 == m2):>9}")
+    finally:
+        for ai in pools.values():
+            ai.close()
+    print()
+
+
+def random_positions(n: int, seed: int = 0) -> List[TicTacToe]:
+    """`n` positions taken from random games (finished ones included)."""
+    rng = random.Random(seed)
+    out: List[TicTacToe] = []
+    while len(out) < n:
+        state = play(())
+        while not state.is_terminal() and len(out) < n:
+            state = state.apply(rng.choice(state.legal_moves()))
+            out.append(state)
+    return out
+
+
+def compare_batch_eval(n: int = 20000, depth: int = 3) -> None:
+    """Scalar heuristic() vs batch_eval.evaluate_batch() on the same positions.
+
+    Throughput is positions per second. Encoding the boards is timed
+    separately, since a search builds its batches from a parent board instead.
+    Then MinimaxAI is timed with and without batch at a fixed depth.
+    """
+    if batch_eval.np is None:
+        print("Batched evaluation: skipped, NumPy is not installed.\n")
+        return
+    sample = random_positions(n)
+    print(f"Leaf evaluation of {n} positions:")
+    start = time.perf_counter()
+    scalar = [MinimaxAI.heuristic(s) for s in sample]
+    t_scalar = time.perf_counter() - start
+    start = time.perf_counter()
+    boards = batch_eval.np.stack([batch_eval.encode(s) for s in sample])
+    t_encode = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = batch_eval.evaluate_batch(boards, geo=BOARD).tolist()
+    t_batch = time.perf_counter() - start
+    print(f"  scalar heuristic(): {n / t_scalar:>12,.0f} /s")
+    print(f"  evaluate_batch():   {n / t_batch:>12,.0f} /s (encoding {n / t_encode:,.0f} /s)")
+    print(f"  same scores:        {scalar == batched}")
+
+    print(f"MinimaxAI, iterative deepening to depth {depth}:")
+    print(f"  {'position':<10} {'scalar (s)':>10} {'batch (s)':>10} {'same move':>9}")
+    for label, moves in positions().items():
+        state = play(moves)
+        results = []
+        for batch in (False, True):
+            ai = MinimaxAI(ai_player=state.next_player, symmetry=False, batch=batch)
+            start = time.perf_counter()
+            move = ai.choose_move(state, max_depth=depth)
+            results.append((move, time.perf_counter() - start))
+        (m1, t1), (m2, t2) = results
+        print(f"  {label:<10} {t1:>10.4f} {t2:>10.4f} {str(m1 == m2):>9}")
+    print()
+
+
+def game_latency(games: int = 2, time_budget: float = 0.5, trace: Optional[str] = None) -> LatencyRecorder:
+    """Per-move latency over whole games, alpha-beta (X) against minimax (O).
+
+    Both engines get `time_budget` seconds a move. Prints the per-engine
+    summary and the mean time by number of empty squares, and writes the
+    trace to `trace` if given (see LatencyRecorder.write()).
+    """
+    recorder = LatencyRecorder()
+    engines = {"X": ("alpha-beta", AlphaBetaAI(ai_player="X")), "O": ("minimax", MinimaxAI(ai_player="O"))}
+    for _ in range(games):
+        state = play(())
+        while not state.is_terminal():
+            name, ai = engines[state.next_player]
+            state = state.apply(recorder.choose_move(name, ai, state, time_budget=time_budget))
+
+    print(f"Per-move latency over {games} games, {time_budget} s budget:")
+    print(recorder.report())
+    print(f"  {'empties':>7} " + " ".join(f"{name:>12}" for name in recorder.engines()))
+    for empties in sorted({r.empties for r in recorder.records}, reverse=True):
+        cells = []
+        for name in recorder.engines():
+            times = [r.seconds for r in recorder.records if r.engine == name and r.empties == empties]
+            cells.append(f"{sum(times) / len(times):>12.4f}" if times else f"{'':>12}")
+        print(f"  {empties:>7} " + " ".join(cells))
+    if trace:
+        recorder.write(trace)
+        print(f"  trace written to {trace}")
+    print()
+    return recorder
+
+
+def tt_stats(ai) -> str:
+    """One-line summary of an engine's transposition table counters."""
+    tt = getattr(ai, "tt", None)
+    if tt is None:
+        return "no transposition table"
+    probes = tt.hits + tt.misses
+    rate = tt.hits / probes if probes else 0.0
+    return (f"hits {tt.hits}, misses {tt.misses} ({rate:.1%} hit rate), "
+            f"cutoffs {tt.cutoffs}, stores {tt.stores}, evictions {tt.evictions}")
 
 
 def main() -> None:
-    n = 400
-    minimax = MinimaxAI(ai_player="X")
-    alphabeta = AlphaBetaAI(ai_player="X")
+    parser = argparse.ArgumentParser(description="Benchmark the Tic-Tac-Toe engines.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="also compare against parallel root-split alpha-beta with this many processes")
+    parser.add_argument("--size", type=int, default=DEFAULT_GEOMETRY.n, help="board is size x size")
+    parser.add_argument("--k", type=int, default=DEFAULT_GEOMETRY.k, help="stones in a row to win")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write the per-move latency trace of the test games to PATH (.json or .csv)")
+    args = parser.parse_args()
+
+    global BOARD
+    BOARD = geometry(args.size, args.k)
+    print(f"Board {BOARD.n}x{BOARD.n}, {BOARD.k} in a row\n")
+
+    compare_orderings()
+    compare_engines()
+    compare_batch_eval()
+    if args.workers > 0:
+        compare_parallel(args.workers)
+    game_latency(trace=args.trace)
 
-    t1 = time_ai(minimax, n=n)
-    t2 = time_ai(alphabeta, n=n)
+    n, depth = 10, 3
+    t1, _ = time_ai(lambda: MinimaxAI(ai_player="X"), n=n, max_depth=depth)
+    t2, alphabeta = time_ai(lambda: AlphaBetaAI(ai_player="X"), n=n, max_depth=depth)
 
-    print(f"Average time per AI move over {n} runs:")
+    print(f"Average time per AI move from the empty board, depth {depth}, over {n} runs:")
     print(f"  Minimax (no pruning): {t1:.6f} s")
     print(f"  Alpha-beta:           {t2:.6f} s")
+    print(f"  Alpha-beta TT:        {tt_stats(alphabeta)}")
     if t2 > 0:
         print(f"  Speedup:              {t1/t2:.2f}x")
 
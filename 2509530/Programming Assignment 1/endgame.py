@@ -0,0 +1,123 @@
+"""Exact endgame solver for n x n Tic-Tac-Toe.
+
+Early in the game only a depth-limited search with the heuristic is
+affordable, but with a dozen or so empty squares left the whole remaining
+tree can be searched. EndgameSolver does that: a win/draw/loss alpha-beta
+search (negamax, so the same code serves X and O) to the end of the game,
+returning a proven result rather than a heuristic guess.
+
+Values are from the point of view of the player to move: +1 win, 0 draw,
+-1 loss. With only three possible values the window is tiny and most nodes
+are cut off quickly. Results are cached in the solver's own transposition
+table. An endgame value never depends on how the position was reached, so
+the table is kept between moves.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from tictactoe import Board, Move, SearchBoard, TicTacToe
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from move_ordering import static_rank
+from anytime import Deadline
+
+
+class EndgameSolver:
+    """Win/draw/loss search to the end of the game.
+
+    solve() raises anytime.SearchTimeout if `deadline` runs out first.
+    `nodes` counts the positions searched by the last solve().
+    """
+
+    def __init__(self, tt_size: int = 1 << 18) -> None:
+        self.tt = TranspositionTable(tt_size)
+        self.nodes = 0
+        self._deadline = Deadline(None)
+
+    def solve(self, state: TicTacToe, deadline: Optional[Deadline] = None) -> Tuple[int, Optional[Move]]:
+        """Return (value, best_move) for the player to move in `state`.
+
+        best_move is a move that achieves the value, or None if the game is
+        already over.
+        """
+        self.nodes = 0
+        self.tt.new_search()
+        self._deadline = deadline or Deadline(None)
+        board = SearchBoard(state)
+        if state.is_terminal():
+            return (0 if state.won_by is None else -1), None
+        try:
+            value, best_move, alpha = -2, None, -1
+            for move in self.ordered(board):
+                board.make(move)
+                val = -self.negamax(board, -1, -alpha)
+                board.unmake()
+                if val > value:
+                    value, best_move = val, move
+                    alpha = max(alpha, val)
+                    if val == 1:
+                        break
+            return value, best_move
+        finally:
+            self._deadline = Deadline(None)
+
+    def ordered(self, board: Board) -> List[Move]:
+        """Legal moves, most central first, then the table's best move in front."""
+        moves = sorted(board.legal_moves(), key=static_rank(board.geo).__getitem__)
+        entry = self.tt.probe(board.zkey)
+        if entry is not None and entry.best_move is not None:
+            moves.remove(entry.best_move)
+            moves.insert(0, entry.best_move)
+        return moves
+
+    def negamax(self, board: Board, alpha: int, beta: int) -> int:
+        self._deadline.check()
+        self.nodes += 1
+        if board.won_by is not None:
+            return -1  # the player who just moved has won
+        empty = board.empty_mask()
+        if empty == 0:
+            return 0
+
+        moves = sorted(board.legal_moves(), key=static_rank(board.geo).__getitem__)
+        key = board.zkey
+        entry = self.tt.probe(key)
+        if entry is not None:
+            if entry.flag == EXACT:
+                self.tt.cutoffs += 1
+                return entry.value
+            if entry.flag == LOWER:
+                alpha = max(alpha, entry.value)
+            else:
+                beta = min(beta, entry.value)
+            if alpha >= beta:
+                self.tt.cutoffs += 1
+                return entry.value
+            if entry.best_move is not None:
+                moves.remove(entry.best_move)
+                moves.insert(0, entry.best_move)
+        alpha_orig = alpha
+
+        value = -2
+        best_move = None
+        for move in moves:
+            board.make(move)
+            val = -self.negamax(board, -beta, -alpha)
+            board.unmake()
+            if val > value:
+                value = val
+                best_move = move
+                if val > alpha:
+                    alpha = val
+                    if alpha >= beta:
+                        break
+
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, value, empty.bit_count(), flag, best_move)
+        return value
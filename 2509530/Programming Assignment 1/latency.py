@@ -0,0 +1,107 @@
+"""Per-move latency recording.
+
+LatencyRecorder wraps an engine's choose_move(): every call is timed and
+logged with the move number, how many squares were empty, and the work the
+engine reports (`nodes`, and beta cutoffs from its move orderer when it has
+one). At the end it summarises mean / p50 / p95 / max time per engine and
+can write the whole trace as CSV or JSON, to see how latency grows as the
+board fills up.
+
+    recorder = LatencyRecorder()
+    move = recorder.choose_move("alpha-beta", ai, state, time_budget=2.0)
+    ...
+    print(recorder.report())
+    recorder.write("trace.csv")
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional, Sequence
+
+from tictactoe import Move, TicTacToe
+
+
+@dataclass
+class MoveRecord:
+    engine: str
+    move_number: int        # 1 for the first move of the game
+    empties: int            # empty squares before the move
+    seconds: float
+    nodes: Optional[int]    # None if the engine does not count them
+    cutoffs: Optional[int]
+    move: Move
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The q-th percentile (0..100) of `values`, interpolating between ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile() of no values")
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class LatencyRecorder:
+    """Times choose_move() calls and keeps one MoveRecord per call."""
+
+    def __init__(self) -> None:
+        self.records: List[MoveRecord] = []
+
+    def choose_move(self, engine: str, ai, state: TicTacToe, **kwargs) -> Move:
+        """Call ai.choose_move(state, **kwargs), record it and return the move."""
+        start = time.perf_counter()
+        move = ai.choose_move(state, **kwargs)
+        elapsed = time.perf_counter() - start
+        orderer = getattr(ai, "orderer", None)
+        self.records.append(MoveRecord(
+            engine=engine,
+            move_number=(state.x_mask | state.o_mask).bit_count() + 1,
+            empties=len(state.legal_moves()),
+            seconds=elapsed,
+            nodes=getattr(ai, "nodes", None),
+            cutoffs=getattr(orderer, "cutoffs", None),
+            move=move,
+        ))
+        return move
+
+    def engines(self) -> List[str]:
+        return list(dict.fromkeys(r.engine for r in self.records))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per engine: moves, mean, p50, p95 and max seconds per move."""
+        out: Dict[str, Dict[str, float]] = {}
+        for engine in self.engines():
+            times = [r.seconds for r in self.records if r.engine == engine]
+            out[engine] = {
+                "moves": len(times),
+                "mean": sum(times) / len(times),
+                "p50": percentile(times, 50),
+                "p95": percentile(times, 95),
+                "max": max(times),
+            }
+        return out
+
+    def report(self) -> str:
+        """The summary as a small table."""
+        lines = [f"  {'engine':<12} {'moves':>5} {'mean (s)':>9} {'p50 (s)':>9} {'p95 (s)':>9} {'max (s)':>9}"]
+        for engine, s in self.summary().items():
+            lines.append(f"  {engine:<12} {s['moves']:>5} {s['mean']:>9.4f} {s['p50']:>9.4f} "
+                         f"{s['p95']:>9.4f} {s['max']:>9.4f}")
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write the trace to `path`: JSON if it ends in .json, CSV otherwise."""
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"moves": [asdict(r) for r in self.records], "summary": self.summary()}, f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=[fl.name for fl in fields(MoveRecord)])
+                writer.writeheader()
+                writer.writerows(asdict(r) for r in self.records)
@@ -1,43 +1,56 @@
 from __future__ import annotations
 
+import argparse
 from typing import Optional
 
-from tictactoe import TicTacToe
-from ai_minimax import MinimaxAI
+from tictactoe import SIZE, WIN_LENGTH, TicTacToe, prompt_move
 from ai_alphabeta_stub import AlphaBetaAI
-import benchmark as bm
-from benchmark import time_ai
+from parallel_search import ParallelAlphaBetaAI
+from opening_book import OpeningBook
+from latency import LatencyRecorder
+from ponder import Ponderer
 
 # For the lab, you will switch to:
 # from ai_alphabeta_stub import AlphaBetaAI
 
+# Seconds the AI may think per move. A full alpha-beta search of the 5x5 board
+# takes far too long, so the AI deepens one ply at a time and plays the best
+# move found when this runs out.
+MOVE_TIME_BUDGET = 2.0
 
-def prompt_move(state: TicTacToe) -> int:
-    while True:
-        raw = input("Enter your move (0-24): ").strip()
-        if not raw.isdigit():
-            print("Please enter a number from 0 to 24.")
-            continue
-        move = int(raw)
-        if move not in range(25):
-            print("Move must be between 0 and 24.")
-            continue
-        if move not in state.legal_moves():
-            print("That square is not available. Try again.")
-            continue
-        return move
+# Let the AI search likely positions while you think (single-process AI only).
+PONDER = True
 
 
 def main() -> None:
-    state = TicTacToe.new()
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe against the alpha-beta AI.")
+    parser.add_argument("--size", type=int, default=SIZE, help="board is size x size")
+    parser.add_argument("--k", type=int, default=WIN_LENGTH, help="stones in a row to win")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="search the AI's root moves on this many processes (above 1 turns pondering off)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write the AI's per-move timings to PATH (.json for JSON, otherwise CSV)")
+    args = parser.parse_args()
+
+    state = TicTacToe.new(args.size, args.k)
+
+    # Empty if opening_book.bin has not been built (python opening_book.py).
+    book = OpeningBook()
 
     # AI plays X, human plays O
-    ai = MinimaxAI(ai_player="X")
+    if args.workers > 1:
+        ai = ParallelAlphaBetaAI(ai_player="X", workers=args.workers, book=book)
+    else:
+        ai = AlphaBetaAI(ai_player="X", book=book, collect_stats=True)
+    ponderer = Ponderer(ai) if PONDER and args.workers <= 1 else None
+    engine = ponderer or ai
 
     human = "O"
+    announced = None  # last proven result told to the player
+    recorder = LatencyRecorder()
 
-    print("Tic-Tac-Toe: You are O, AI is X.")
-    print("Board squares are numbered 0..24 as shown when empty.")
+    print(f"Tic-Tac-Toe on {args.size}x{args.size}, {args.k} in a row: You are O, AI is X.")
+    print(f"Board squares are numbered 0..{state.geo.n_cells - 1} as shown when empty.")
     print()
 
     while not state.is_terminal():
@@ -45,15 +58,36 @@ def main() -> None:
         print()
 
         if state.next_player == human:
+            if ponderer is not None:
+                ponderer.start(state)
             mv = prompt_move(state)
             state = state.apply(mv)
         else:
 
-            mv_ai = ai.choose_move(state)
-            print(f"Minimax AI plays: {mv_ai}")
+            mv_ai = recorder.choose_move("alpha-beta", engine, state, time_budget=MOVE_TIME_BUDGET)
+            if ponderer is not None and ponderer.pondered:
+                source = "pondered"
+            else:
+                source = "opening book" if ai.from_book else "searched"
+            took = recorder.records[-1]
+            print(f"Alpha-beta AI plays: {mv_ai} ({source}, {ai.last_depth} plies ahead, "
+                  f"{took.seconds:.3f} s, {took.nodes} nodes)")
+            if ai.stats is not None and ai.stats.nodes and source == "searched":
+                print(f"  search: {ai.stats.summary()}")
+            if ai.proven is not None and ai.proven != announced:
+                announced = ai.proven
+                if ai.proven > 0:
+                    print("The AI has found a forced win.")
+                elif ai.proven < 0:
+                    print("You have a forced win, if you can find it.")
+                else:
+                    print("With best play from here the game is a draw.")
 
             state = state.apply(mv_ai)  # Change approach from Minimax to Alpha-Beta instead
 
+    if ponderer is not None:
+        ponderer.stop()  # the game may have ended on your move
+
     print(state.render())
     w = state.winner()
     if w is None:
@@ -62,10 +96,14 @@ def main() -> None:
         print(f"\nResult: {w} wins.")
 
 
-    print("\nAI benchmarking:")
+    print("\nAI move times this game:")
+    print(recorder.report())
+    if args.trace:
+        recorder.write(args.trace)
+        print(f"Per-move trace written to {args.trace}")
 
-    # Benchmark Minimax AI
-    print(f"\nBenchmarking Minimax AI: {time_ai(ai,25):.6f} seconds per move")
+    if args.workers > 1:
+        ai.close()
 
 
 
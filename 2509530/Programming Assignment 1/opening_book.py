@@ -0,0 +1,168 @@
+"""Opening book for n x n Tic-Tac-Toe.
+
+The first few positions of a game are the same every time, so their best
+moves can be searched once, offline and deeply, and then just looked up.
+
+Running this file builds the book: every position reachable in the first
+`--plies` plies (one per symmetry class) is searched by AlphaBetaAI with a
+generous time budget, spread over a pool of worker processes, e.g.
+
+    python opening_book.py --plies 3 --time 5 --workers 4
+
+A book belongs to one board: the header is the magic string followed by the
+board size and the win length (one byte each), and probing a position on any
+other board finds nothing. The header is followed by fixed-size records
+sorted by key:
+
+    key    8 bytes  canonical Zobrist key (symmetry.canonical_key)
+    move   1 byte   best move, in the canonical frame of the position
+    depth  1 byte   plies searched
+    score  2 bytes  search score for the player to move
+
+OpeningBook memory-maps the file and binary-searches the keys, so opening
+it costs nothing however big the book is.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from tictactoe import SIZE, WIN_LENGTH, Move, Player, TicTacToe, geometry
+from symmetry import canonical_key, symmetries
+
+
+MAGIC = b"T5BOOK02"
+HEADER = struct.Struct(f"<{len(MAGIC)}sBB")
+RECORD = struct.Struct("<QBBh")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+
+class OpeningBook:
+    """Read-only, memory-mapped opening book.
+
+    A missing file gives an empty book, so engines can always consult one.
+    `n` and `k` are the board the book was built for.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self.data: Optional[mmap.mmap] = None
+        self.count = 0
+        self.n, self.k = SIZE, WIN_LENGTH
+        if os.path.exists(path) and os.path.getsize(path) > HEADER.size:
+            with open(path, "rb") as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.n, self.k = HEADER.unpack_from(self.data)
+            if magic != MAGIC:
+                self.data.close()
+                self.data = None
+                raise ValueError(f"{path} is not an opening book (or was built by an older version).")
+            self.count = (len(self.data) - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+    def _record(self, i: int) -> Tuple[int, int, int, int]:
+        return RECORD.unpack_from(self.data, HEADER.size + i * RECORD.size)
+
+    def probe(self, state: TicTacToe) -> Optional[Tuple[Move, int, int]]:
+        """Return (move, depth, score) for `state`, or None if it is not in the book."""
+        if not self.count or (state.geo.n, state.geo.k) != (self.n, self.k):
+            return None
+        key, t = canonical_key(state)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.count:
+            return None
+        found, move, depth, score = self._record(lo)
+        if found != key:
+            return None
+        return symmetries(state.geo).inverse[t][move], depth, score
+
+
+def book_positions(plies: int, n: int = SIZE, k: int = WIN_LENGTH) -> List[TicTacToe]:
+    """One position per symmetry class for each of the first `plies` plies."""
+    start = TicTacToe.new(n, k)
+    layer = {canonical_key(start)[0]: start}
+    out: List[TicTacToe] = []
+    for _ in range(plies):
+        out.extend(layer.values())
+        nxt: Dict[int, TicTacToe] = {}
+        for state in layer.values():
+            for move in state.legal_moves():
+                child = state.apply(move)
+                if not child.is_terminal():
+                    nxt.setdefault(canonical_key(child)[0], child)
+        layer = nxt
+    return out
+
+
+def _search_position(n: int, k: int, x_mask: int, o_mask: int, next_player: Player,
+                     seconds: float) -> Tuple[int, int, int, int]:
+    """Worker task: search one position; returns a book record."""
+    # imported here so the book can be read without loading the engines
+    from ai_alphabeta_stub import AlphaBetaAI
+
+    state = TicTacToe.from_masks(x_mask, o_mask, next_player, geometry(n, k))
+    ai = AlphaBetaAI(ai_player=next_player)
+    move = ai.choose_move(state, time_budget=seconds)
+    key, t = canonical_key(state)
+    return key, symmetries(state.geo).transforms[t][move], min(ai.last_depth, 255), ai.last_score
+
+
+def build_book(plies: int = 3, seconds: float = 5.0, workers: int = 1,
+               path: str = DEFAULT_PATH, n: int = SIZE, k: int = WIN_LENGTH) -> int:
+    """Search the first `plies` plies of the n x n, k-in-a-row game and write
+    the book to `path`.
+
+    Returns the number of positions written.
+    """
+    positions = book_positions(plies, n, k)
+    tasks = [(n, k, s.x_mask, s.o_mask, s.next_player, seconds) for s in positions]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(_search_position, *zip(*tasks)))
+    else:
+        records = [_search_position(*task) for task in tasks]
+
+    records.sort()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n, k))
+        for record in records:
+            f.write(RECORD.pack(*record))
+    os.replace(tmp, path)
+    return len(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the opening book.")
+    parser.add_argument("--plies", type=int, default=3, help="book positions up to this many plies in")
+    parser.add_argument("--time", type=float, default=5.0, help="seconds of search per position")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--out", default=DEFAULT_PATH, help="book file to write")
+    parser.add_argument("--size", type=int, default=SIZE, help="board is size x size")
+    parser.add_argument("--k", type=int, default=WIN_LENGTH, help="stones in a row to win")
+    args = parser.parse_args()
+
+    count = build_book(args.plies, args.time, args.workers, args.out, args.size, args.k)
+    print(f"Wrote {count} positions for {args.size}x{args.size}, k={args.k} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Root-split parallel alpha-beta search.
+
+The root moves are searched by a pool of worker processes, each with its own
+AlphaBetaAI (and transposition table, kept for the life of the pool):
+
+  - The first root move (the best one from the previous iteration, or the
+    best under move ordering) is searched on its own first, to get a good
+    bound ("young brothers wait").
+  - The remaining moves are then handed out as workers become free. Each new
+    task gets the best value found so far as its alpha (beta when the root
+    player is minimising), so later moves are searched with tighter windows.
+  - The window is widened by 1 so a move that ties the best value is always
+    scored exactly. The chosen move is the first one in root order with the
+    best value. That makes the result independent of which worker finished
+    first.
+
+The bound is only shared when a move is handed out. A worker that is
+already searching keeps the window it started with, even if another worker
+finds a better value meanwhile, so it may search more than it has to. The
+result is the same either way, only the node count differs.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from tictactoe import TicTacToe, Move, Player, geometry
+from ai_alphabeta_stub import AlphaBetaAI
+from anytime import WIN_SCORE, Deadline, SearchTimeout, is_proven
+from symmetry import unique_moves
+from opening_book import OpeningBook
+
+
+_worker_ai: Optional[AlphaBetaAI] = None
+
+
+def _init_worker(tt_size: int, symmetry: bool, ordering: str) -> None:
+    global _worker_ai
+    _worker_ai = AlphaBetaAI(tt_size=tt_size, symmetry=symmetry, ordering=ordering)
+
+
+def _search_root_move(n: int, k: int, x_mask: int, o_mask: int, next_player: Player, move: Move,
+                      player: Player, alpha: int, beta: int, depth: Optional[int],
+                      seconds: Optional[float], pv: List[Move]) -> Tuple[Optional[int], int, List[Move]]:
+    """Worker task: score one root move.
+
+    Returns (value, nodes, line). depth=None runs a full search to the end of
+    the game on the -1..1 scale; otherwise a depth-limited search with
+    `seconds` left on the clock, and value is None if time ran out.
+    """
+    ai = _worker_ai
+    child = TicTacToe.from_masks(x_mask, o_mask, next_player, geometry(n, k)).apply(move)
+    ai.nodes = 0
+    if ai.tt is not None:
+        ai.tt.new_search()
+    ai.prepare(child)
+    if depth is None:
+        return ai.alphabeta_value(child, player, alpha, beta), ai.nodes, [move]
+
+    ai._prev_pv = pv
+    ai._deadline = Deadline(seconds)
+    try:
+        value = ai.alphabeta_limited(child, player, alpha, beta, depth - 1, 1, bool(pv) and pv[0] == move)
+    except SearchTimeout:
+        return None, ai.nodes, []
+    finally:
+        ai._deadline = Deadline(None)
+    return value, ai.nodes, [move] + ai._pv[1]
+
+
+class ParallelAlphaBetaAI(AlphaBetaAI):
+    """AlphaBetaAI whose root moves are searched on `workers` processes.
+
+    choose_move() takes the same arguments as AlphaBetaAI.choose_move(). Call
+    close() (or use it in a `with` block) to shut the worker pool down.
+    """
+
+    def __init__(self, ai_player: Player = "X", workers: int = 2, tt_size: int = 1 << 20,
+                 symmetry: bool = True, ordering: str = "all", endgame_empties: int = 14,
+                 book: Optional[OpeningBook] = None) -> None:
+        # The search itself runs in the workers; this process only needs a
+        # tiny table of its own. Endgames are solved here, not in the pool.
+        super().__init__(ai_player, tt_size=0, symmetry=symmetry, ordering=ordering,
+                         endgame_empties=endgame_empties, book=book)
+        self.workers = workers
+        self.worker_settings = (tt_size, symmetry, ordering)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=self.worker_settings)
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "ParallelAlphaBetaAI":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def split_root(self, state: TicTacToe, player: Player, moves: List[Move], depth: Optional[int],
+                   deadline: Optional[Deadline]) -> Tuple[Dict[Move, int], Dict[Move, List[Move]], bool]:
+        """Search every root move in `moves` on the pool.
+
+        Returns (values, lines, complete). `values` maps each finished move to
+        its score and `lines` to its principal variation. `complete` is False
+        if the deadline stopped any move.
+        """
+        pool = self.pool()
+        maximising = state.next_player == player
+        bound = 2 if depth is None else WIN_SCORE + 1
+        pv = self._prev_pv
+        values: Dict[Move, int] = {}
+        lines: Dict[Move, List[Move]] = {}
+        best: Optional[int] = None
+        pending = list(moves)
+        running: Dict[Future, Move] = {}
+        complete = True
+
+        while pending or running:
+            # the eldest brother runs alone; after that keep every worker busy
+            while pending and len(running) < self.workers and (values or not running) and complete:
+                move = pending.pop(0)
+                if maximising:
+                    alpha, beta = (-bound if best is None else best - 1), bound
+                else:
+                    alpha, beta = -bound, (bound if best is None else best + 1)
+                seconds = None if deadline is None else deadline.remaining()
+                fut = pool.submit(_search_root_move, state.geo.n, state.geo.k, state.x_mask, state.o_mask,
+                                  state.next_player, move, player, alpha, beta, depth, seconds, pv)
+                running[fut] = move
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                move = running.pop(fut)
+                value, nodes, line = fut.result()
+                self.nodes += nodes
+                if value is None:
+                    complete = False
+                    continue
+                values[move] = value
+                lines[move] = line
+                if best is None or ((value > best) if maximising else (value < best)):
+                    best = value
+        return values, lines, complete and not pending
+
+    def pick(self, state: TicTacToe, player: Player, moves: List[Move],
+             values: Dict[Move, int]) -> Tuple[Optional[Move], Optional[int]]:
+        """First move in root order with the best value among `values`."""
+        if not values:
+            return None, None
+        maximising = state.next_player == player
+        best = max(values.values()) if maximising else min(values.values())
+        for move in moves:
+            if values.get(move) == best:
+                return move, best
+        return None, None
+
+    def choose_move(self, state: TicTacToe, time_budget: Optional[float] = None,
+                    max_depth: Optional[int] = None) -> Move:
+        self.prepare(state)
+        self.nodes = 0
+        self._prev_pv = []
+        move = self.book_move(state)
+        if move is not None:
+            return move
+        deadline = Deadline(time_budget)
+        move = self.solve_endgame(state, deadline)
+        if move is not None:
+            return move
+        player = self.ai_player
+        moves = unique_moves(state) if self.symmetry else state.legal_moves()
+        moves = self.orderer.order(state, moves, 0)
+
+        if time_budget is None and max_depth is None:
+            values, _, _ = self.split_root(state, player, moves, None, None)
+            return self.pick(state, player, moves, values)[0]
+
+        if max_depth is None or max_depth > len(state.legal_moves()):
+            max_depth = len(state.legal_moves())
+        best_move = moves[0]
+        self.last_depth, self.last_score, self.last_pv = 0, 0, []
+
+        for depth in range(1, max_depth + 1):
+            if self._prev_pv:
+                moves.remove(self._prev_pv[0])
+                moves.insert(0, self._prev_pv[0])
+            values, lines, complete = self.split_root(state, player, moves, depth,
+                                                      None if depth == 1 else deadline)
+            move, score = self.pick(state, player, moves, values)
+            if not complete:
+                # only trust a cut-short iteration if the previous best was re-searched
+                if moves[0] in values and move is not None:
+                    best_move, self.last_score, self.last_pv = move, score, lines[move]
+                break
+            best_move = move
+            self.last_depth, self.last_score, self.last_pv = depth, score, lines[move]
+            self._prev_pv = lines[move]
+            if is_proven(score) or deadline.expired():
+                break
+        if is_proven(self.last_score) and self.last_score > 0:
+            self.proven = 1
+        return best_move
@@ -0,0 +1,135 @@
+"""Thinking on the opponent's time (pondering).
+
+While the human picks a move the AI would otherwise sit idle. Ponderer uses
+that time: a background thread goes through the human's possible replies,
+most likely first, and searches the position after each one with the AI's
+own engine. The results are kept per position, and the engine's
+transposition table fills up with the work as a side effect.
+
+When the human has moved, stop() cancels the search in progress (through
+Deadline.cancel()) and waits for the thread. choose_move() then plays the
+pondered answer straight away if that position was searched for at least
+the move's time budget (or solved outright), and otherwise searches it for
+whatever is left of the budget, starting from the warm table.
+
+Python threads share one interpreter lock, but input() releases it while it
+waits, so the background search gets nearly all of the human's thinking
+time.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from tictactoe import Move, TicTacToe
+from anytime import Deadline
+
+
+@dataclass
+class PonderResult:
+    move: Move              # the AI's answer
+    depth: int
+    score: int
+    proven: Optional[int]
+    seconds: float          # search time spent on this position so far
+    nodes: int
+
+
+class Ponderer:
+    """Background search of the opponent's replies for an AlphaBetaAI.
+
+    start(state) begins pondering `state` (the opponent to move); stop()
+    ends it. choose_move(state, time_budget) takes the place of the AI's
+    own choose_move() and sets `pondered` when it played the background
+    search's answer without searching again. Other attributes (nodes,
+    last_depth, proven, ...) are the AI's.
+    """
+
+    # Each reply is first searched for SLICE seconds; after every pass over
+    # all the replies the slice doubles.
+    SLICE = 0.25
+
+    def __init__(self, ai) -> None:
+        self.ai = ai
+        self.results: Dict[int, PonderResult] = {}  # by zkey of the position after the reply
+        self.pondered = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._deadline = Deadline(None)
+
+    def __getattr__(self, name: str):
+        if name == "ai":
+            raise AttributeError(name)
+        return getattr(self.ai, name)
+
+    def replies(self, state: TicTacToe) -> List[Move]:
+        """The opponent's moves, the one the AI's last principal variation
+        expects first, then in move-ordering order."""
+        moves = self.ai.orderer.order(state, state.legal_moves(), 0)
+        pv = self.ai.last_pv
+        if len(pv) >= 2 and pv[1] in moves:
+            moves.remove(pv[1])
+            moves.insert(0, pv[1])
+        return moves
+
+    def start(self, state: TicTacToe) -> None:
+        self.stop()
+        self.results = {}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(state,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Cancel the background search and wait for it to finish."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._deadline.cancel()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, state: TicTacToe) -> None:
+        ai = self.ai
+        children = [state.apply(m) for m in self.replies(state)]
+        children = [c for c in children if not c.is_terminal()]
+        seconds = self.SLICE
+        while children:
+            for child in list(children):
+                deadline = Deadline(seconds)
+                self._deadline = deadline
+                # checked after publishing the deadline, so stop() cannot miss it
+                if self._stop.is_set():
+                    return
+                start = time.perf_counter()
+                move = ai.choose_move(child, deadline=deadline)
+                elapsed = time.perf_counter() - start
+
+                prev = self.results.get(child.zkey)
+                spent = elapsed + (prev.seconds if prev else 0.0)
+                if prev is None or ai.proven is not None or ai.last_depth >= prev.depth:
+                    self.results[child.zkey] = PonderResult(move, ai.last_depth, ai.last_score, ai.proven,
+                                                            spent, ai.nodes)
+                else:
+                    prev.seconds = spent
+                if ai.proven is not None or ai.from_book or ai.last_depth >= len(child.legal_moves()):
+                    children.remove(child)  # nothing more to learn about this one
+            seconds *= 2
+
+    def choose_move(self, state: TicTacToe, time_budget: Optional[float] = None) -> Move:
+        """The AI's move in `state`, reusing the pondered search if there is one."""
+        self.stop()
+        ai = self.ai
+        hit = self.results.get(state.zkey)
+        self.pondered = False
+        if hit is not None and (hit.proven is not None or time_budget is None or hit.seconds >= time_budget):
+            self.pondered = True
+            ai.from_book = False
+            ai.last_depth, ai.last_score, ai.last_pv = hit.depth, hit.score, [hit.move]
+            ai.proven, ai.nodes = hit.proven, hit.nodes
+            return hit.move
+        if hit is not None:
+            time_budget -= hit.seconds  # the table already holds that much search
+        return ai.choose_move(state, time_budget=time_budget)
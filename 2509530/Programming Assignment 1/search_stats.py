@@ -0,0 +1,61 @@
+"""Counters describing how much work a search did.
+
+Engines built with collect_stats=True make a fresh SearchStats at the start
+of every choose_move() and leave it in their `stats` attribute; otherwise
+`stats` is None and the search only pays for one `is not None` test per
+node. Depths are plies below the root: 1 is the root's children.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+
+class SearchStats:
+    """Node, evaluation, cutoff and transposition-table counts of one search.
+
+    cutoff_index[i] counts the cutoffs caused by the i-th move searched at a
+    node (0 = the first), so with good move ordering almost all of them are
+    at index 0.
+    """
+
+    __slots__ = ("nodes_by_depth", "terminals", "evals", "cutoffs", "cutoff_index", "tt_hits")
+
+    def __init__(self) -> None:
+        self.nodes_by_depth: List[int] = []
+        self.terminals = 0   # finished games reached
+        self.evals = 0       # heuristic evaluations at the horizon
+        self.cutoffs = 0     # alpha/beta cutoffs
+        self.cutoff_index: List[int] = []
+        self.tt_hits = 0     # transposition table probes that found an entry
+
+    def node(self, depth: int) -> None:
+        counts = self.nodes_by_depth
+        while len(counts) <= depth:
+            counts.append(0)
+        counts[depth] += 1
+
+    def cutoff(self, index: int) -> None:
+        self.cutoffs += 1
+        counts = self.cutoff_index
+        while len(counts) <= index:
+            counts.append(0)
+        counts[index] += 1
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_by_depth)
+
+    def first_move_cutoff_rate(self) -> float:
+        """Share of the cutoffs caused by the first move searched."""
+        return self.cutoff_index[0] / self.cutoffs if self.cutoffs else 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def summary(self) -> str:
+        """One line: totals, cutoff quality and nodes per depth."""
+        depths = " ".join(f"{d}:{n}" for d, n in enumerate(self.nodes_by_depth) if n)
+        return (f"nodes {self.nodes} [{depths}], terminals {self.terminals}, evals {self.evals}, "
+                f"cutoffs {self.cutoffs} ({self.first_move_cutoff_rate():.0%} on the first move), "
+                f"tt hits {self.tt_hits}")
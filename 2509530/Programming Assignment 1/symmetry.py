@@ -0,0 +1,152 @@
+"""Board symmetries for n x n Tic-Tac-Toe.
+
+The board (and the set of winning lines) looks the same after any of the 8
+rotations/reflections of the square, so a position and its mirror images have
+the same value. This module maps a position to a canonical representative of
+its symmetry class so the search can:
+  - share cached values between all symmetric copies of a position, and
+  - skip root moves that are mirror images of one already considered.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+from tictactoe import DEFAULT_GEOMETRY, Geometry, Move, TicTacToe
+
+
+def _perm(n: int, t: int) -> Tuple[int, ...]:
+    """Square i goes to square _perm(n, t)[i] under transform t on an n x n board."""
+    m = n - 1
+    out = []
+    for i in range(n * n):
+        r, c = divmod(i, n)
+        r2, c2 = (
+            (r, c),          # identity
+            (c, m - r),      # rotate 90
+            (m - r, m - c),  # rotate 180
+            (m - c, r),      # rotate 270
+            (r, m - c),      # mirror left-right
+            (m - r, c),      # mirror top-bottom
+            (c, r),          # main diagonal
+            (m - c, m - r),  # anti-diagonal
+        )[t]
+        out.append(r2 * n + c2)
+    return tuple(out)
+
+
+# Masks are transformed CHUNK squares at a time, one table lookup per chunk.
+CHUNK = 8
+
+
+def _chunk_tables(n_cells: int, transforms, value_of) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    tables = []
+    for p in transforms:
+        chunks = []
+        for first in range(0, n_cells, CHUNK):
+            size = min(CHUNK, n_cells - first)
+            table = []
+            for bits in range(1 << size):
+                acc = 0
+                for c in range(size):
+                    if bits >> c & 1:
+                        acc ^= value_of(p[first + c])
+                table.append(acc)
+            chunks.append(tuple(table))
+        tables.append(tuple(chunks))
+    return tuple(tables)
+
+
+@dataclass(frozen=True, eq=False)
+class Symmetries:
+    """The 8 symmetries of one board, built once per Geometry by symmetries().
+
+    transforms[t][i] is where square i goes under transform t and inverse[t]
+    undoes it. Applying a transform bit by bit is slow, so the mask is cut
+    into CHUNK-square pieces and each piece is looked up in a table giving
+    its contribution to the transformed mask (mask_chunks), and likewise to
+    the transformed Zobrist key (zx_chunks / zo_chunks).
+    """
+
+    transforms: Tuple[Tuple[int, ...], ...]
+    inverse: Tuple[Tuple[int, ...], ...]
+    mask_chunks: Tuple[Tuple[Tuple[int, ...], ...], ...]
+    zx_chunks: Tuple[Tuple[Tuple[int, ...], ...], ...]
+    zo_chunks: Tuple[Tuple[Tuple[int, ...], ...], ...]
+    n_chunks: int
+
+    def chunks(self, mask: int) -> List[int]:
+        low = (1 << CHUNK) - 1
+        return [(mask >> (j * CHUNK)) & low for j in range(self.n_chunks)]
+
+
+@lru_cache(maxsize=None)
+def symmetries(geo: Geometry) -> Symmetries:
+    n = geo.n
+    transforms = tuple(_perm(n, t) for t in range(8))
+    cells = geo.n_cells
+    assert all(sorted(p) == list(range(cells)) for p in transforms), "transforms must permute the squares"
+    return Symmetries(
+        transforms=transforms,
+        inverse=tuple(tuple(sorted(range(cells), key=lambda i: p[i])) for p in transforms),
+        mask_chunks=_chunk_tables(cells, transforms, lambda sq: 1 << sq),
+        zx_chunks=_chunk_tables(cells, transforms, lambda sq: geo.zobrist["X"][sq]),
+        zo_chunks=_chunk_tables(cells, transforms, lambda sq: geo.zobrist["O"][sq]),
+        n_chunks=(cells + CHUNK - 1) // CHUNK,
+    )
+
+
+def transform_mask(mask: int, t: int, geo: Geometry = DEFAULT_GEOMETRY) -> int:
+    sym = symmetries(geo)
+    out = 0
+    for table, bits in zip(sym.mask_chunks[t], sym.chunks(mask)):
+        out |= table[bits]
+    return out
+
+
+def canonical_key(state: TicTacToe) -> Tuple[int, int]:
+    """Return (key, t): a Zobrist key shared by all 8 symmetric copies of `state`.
+
+    Each transform t gives the Zobrist key of the transformed position, and the
+    smallest of the 8 is used. `t` is the transform that produced it.
+    """
+    geo = state.geo
+    sym = symmetries(geo)
+    xc = sym.chunks(state.x_mask)
+    oc = sym.chunks(state.o_mask)
+    side = geo.zobrist_o_to_move if state.next_player == "O" else 0
+    best_key = -1
+    best_t = 0
+    for t in range(8):
+        zx = sym.zx_chunks[t]
+        zo = sym.zo_chunks[t]
+        key = side
+        for j in range(sym.n_chunks):
+            key ^= zx[j][xc[j]] ^ zo[j][oc[j]]
+        if best_key < 0 or key < best_key:
+            best_key = key
+            best_t = t
+    return best_key, best_t
+
+
+def stabilizer(state: TicTacToe) -> List[int]:
+    """Transforms that leave `state` unchanged (always includes the identity)."""
+    x, o, geo = state.x_mask, state.o_mask, state.geo
+    return [t for t in range(8) if transform_mask(x, t, geo) == x and transform_mask(o, t, geo) == o]
+
+
+def unique_moves(state: TicTacToe) -> List[Move]:
+    """Legal moves with mirror-image duplicates removed.
+
+    Two moves are duplicates when a symmetry of the current position maps one
+    onto the other. The lowest-numbered move of each group is kept, so the
+    result is a subset of legal_moves() in the same order.
+    """
+    moves = state.legal_moves()
+    stab = stabilizer(state)
+    if len(stab) == 1:
+        return moves
+    transforms = symmetries(state.geo).transforms
+    return [m for m in moves if all(transforms[t][m] >= m for t in stab)]
@@ -1,26 +1,172 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import math
+import random
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 
 Player = str  # 'X' or 'O'
-Move = int    # 0..8 inclusive
+Move = int    # square index, 0..n*n-1 (0..24 on the default board)
 
 
-WIN_LINES: Tuple[Tuple[int, int, int], ...] = (
-    (0, 1, 2), (5, 6, 7), (10, 11, 12), (15, 16, 17), (20, 21, 22), (1, 2, 3), (6, 7, 8), (11, 12, 13), (16, 17, 18), (21, 22, 23), (2, 3, 4), (7, 8, 9), (12, 13, 14), (17, 18, 19), (22, 23, 24),  # rows
-    (0, 5, 10), (1, 6, 11), (2, 7, 12), (3, 8, 13), (4, 9, 14), (5, 10, 15), (6, 11, 16), (7, 12, 17), (8, 13, 18), (9, 14, 19), (10, 15, 20), (11, 16, 21), (12, 17, 22), (13, 18, 23), (14, 19, 24),  # cols
-    (2, 8, 14), (1, 7, 13), (7, 13, 19), (0, 6, 12), (6, 12, 18), (12, 18, 24), (5, 11, 17), (11, 17, 23), (10, 16, 22),
-    (2, 6, 10), (3, 7, 11), (7, 11, 15), (4, 8, 12), (8, 12, 16), (12, 16, 20), (9, 13, 17), (13, 17, 21), (14, 18, 22)    # diagonals
-)
+SIZE = 5        # default board is SIZE x SIZE
+WIN_LENGTH = 3  # default number in a row needed to win
+
+# Finished games score WIN_SCORE - ply (see anytime.terminal_score), and a
+# score above WIN_SCORE // 2 counts as proven, so every heuristic score has
+# to stay at or below that: geometry() scales the line scores down on boards
+# with so many lines that it could not.
+# Opening books store scores in 16 bits, so this must stay below 32768.
+WIN_SCORE = 30000
+
+
+@dataclass(frozen=True, eq=False)
+class Geometry:
+    """Everything about the board that depends only on its size n and the run
+    length k needed to win. geometry(n, k) builds it once and caches it, so
+    every state on the same board shares one Geometry.
+
+    Squares are numbered row by row, 0 .. n*n - 1, and bit i of a mask is set
+    when square i belongs to that mask. A line is won by a player when
+    (player_mask & line_mask) == line_mask.
+    """
+
+    n: int
+    k: int
+    n_cells: int
+    full_mask: int                                  # every square occupied
+    win_lines: Tuple[Tuple[int, ...], ...]
+    win_masks: Tuple[int, ...]
+    # (stride, start squares) per direction, see has_line()
+    line_starts: Tuple[Tuple[int, int], ...]
+    # cell_lines[i] lists the indices into win_lines of every line through
+    # square i, and cell_masks[i] the matching masks. After a move to square
+    # i only these lines can have changed.
+    cell_lines: Tuple[Tuple[int, ...], ...]
+    cell_masks: Tuple[Tuple[int, ...], ...]
+    # Zobrist keys: one random 64-bit number per (player, square) plus one for
+    # "O to move". A position's key is the XOR of the keys of everything on it,
+    # so a move updates it with two XORs.
+    zobrist: Dict[Player, Tuple[int, ...]]
+    zobrist_o_to_move: int
+    # zobrist[player][i] ^ zobrist_o_to_move: the whole key change of a move
+    zobrist_move: Dict[Player, Tuple[int, ...]]
+    # Heuristic score of one line, indexed by its count code x + (k+1) * o
+    # (x X's and o O's on it), see _line_score(). A move only changes the
+    # codes of the lines through its square, so a running score can be
+    # updated by the difference; code_step is what a move adds to the code.
+    code_step: Dict[Player, int]
+    line_score: Tuple[int, ...]
+    # largest heuristic score any position can reach (every line at its best)
+    max_heuristic: int
+
+    def has_line(self, mask: int) -> bool:
+        """True if `mask` owns a whole line (a full scan, for positions with no history)."""
+        k = self.k
+        for stride, starts in self.line_starts:
+            run = mask
+            for i in range(1, k):
+                run &= mask >> (i * stride)
+            if run & starts:
+                return True
+        return False
+
+    def line_codes(self, x_mask: int, o_mask: int) -> List[int]:
+        """Count code of every line in win_lines."""
+        step = self.k + 1
+        return [(x_mask & m).bit_count() + step * (o_mask & m).bit_count() for m in self.win_masks]
+
+
+def _win_lines(n: int, k: int) -> Tuple[Tuple[int, ...], ...]:
+    """Every run of k squares along a row, column or diagonal of an n x n board."""
+    lines = []
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):  # rows, cols, diagonals
+        for r in range(n):
+            for c in range(n):
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < n and 0 <= end_c < n:
+                    lines.append(tuple((r + dr * i) * n + c + dc * i for i in range(k)))
+    return tuple(lines)
+
+
+def _line_score(code: int, k: int) -> int:
+    """Heuristic value of a line: +1 / +10 / +100 ... for 1 / 2 / 3 ... X's
+    short of a full line, the same negated for O's, nothing if contested."""
+    x, o = code % (k + 1), code // (k + 1)
+    if x and o:
+        return 0
+
+    def run(count: int) -> int:
+        return 10 ** (count - 1) if 0 < count < k else 0
+
+    return run(x) - run(o)
+
+
+@lru_cache(maxsize=None)
+def geometry(n: int = SIZE, k: int = WIN_LENGTH) -> Geometry:
+    if not 1 <= k <= n:
+        raise ValueError(f"Need 1 <= k <= n, got n={n}, k={k}.")
+    n_cells = n * n
+    lines = _win_lines(n, k)
+    line_score = tuple(_line_score(code, k) for code in range((k + 1) ** 2))
+    max_heuristic = len(lines) * max(abs(v) for v in line_score)
+    if max_heuristic > WIN_SCORE // 2:
+        # e.g. 6x6 with k=5: 32 lines * 1000. Divide every line score by the
+        # same factor (rounding towards 0) so no position can look proven.
+        factor = -(-max_heuristic // (WIN_SCORE // 2))
+        line_score = tuple(v // factor if v >= 0 else -(-v // factor) for v in line_score)
+        max_heuristic = len(lines) * max(abs(v) for v in line_score)
+    masks = tuple(sum(1 << i for i in line) for line in lines)
+
+    # Every line is (a, a + s, ..., a + (k-1)s) for some stride s, so for each
+    # stride keep the mask of squares a line may start from. A player owns a
+    # line of that stride exactly when m & (m >> s) & ... hits a start square.
+    starts: Dict[int, int] = {}
+    for line in lines:
+        stride = line[1] - line[0] if k > 1 else 1
+        starts[stride] = starts.get(stride, 0) | (1 << line[0])
+
+    cell_lines = tuple(tuple(j for j, line in enumerate(lines) if i in line) for i in range(n_cells))
+    # The seed is fixed so keys agree between runs.
+    rng = random.Random(f"zobrist {n}x{n} k={k}")
+    zobrist = {
+        "X": tuple(rng.getrandbits(64) for _ in range(n_cells)),
+        "O": tuple(rng.getrandbits(64) for _ in range(n_cells)),
+    }
+    o_to_move = rng.getrandbits(64)
+    return Geometry(
+        n=n, k=k, n_cells=n_cells, full_mask=(1 << n_cells) - 1,
+        win_lines=lines, win_masks=masks, line_starts=tuple(sorted(starts.items())),
+        cell_lines=cell_lines, cell_masks=tuple(tuple(masks[j] for j in js) for js in cell_lines),
+        zobrist=zobrist, zobrist_o_to_move=o_to_move,
+        zobrist_move={p: tuple(z ^ o_to_move for z in keys) for p, keys in zobrist.items()},
+        code_step={"X": 1, "O": k + 1},
+        line_score=line_score, max_heuristic=max_heuristic,
+    )
+
+
+DEFAULT_GEOMETRY = geometry()
+N_CELLS = DEFAULT_GEOMETRY.n_cells
+WIN_LINES = DEFAULT_GEOMETRY.win_lines
+
+
+def _bits(mask: int) -> List[int]:
+    """Return the indices of the set bits of `mask` in ascending order."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
 
 
 @dataclass
 class TicTacToe:
-    """A simple 3x3 Tic‑Tac‑Toe game state.
+    """An n x n, k-in-a-row Tic‑Tac‑Toe game state (5x5, 3 in a row by default).
 
-    Board squares are indexed like:
+    Board squares are numbered row by row; on the default board:
          0 |  1 |  2 |  3 |  4
         ---+----+----+----+---
          5 |  6 |  7 |  8 |  9
@@ -30,37 +176,113 @@ class TicTacToe:
         15 | 16 | 17 | 18 | 19
         ---+----+----+----+---
         20 | 21 | 22 | 23 | 24
+
+    The position is stored as two bitboards, one integer per player, where
+    bit i is set if that player owns square i. `board` rebuilds the familiar
+    list-of-strings view on demand for rendering and the heuristic. `geo`
+    holds the board's size, win lines and lookup tables (see Geometry).
+
+    `last_move` is the square just played and `won_by` caches the winner.
+    apply() fills `won_by` by checking only the lines through `last_move`, so
+    winner()/is_terminal()/outcome_value() never rescan the board. `zkey` is
+    the position's Zobrist hash, also kept up to date by apply().
+
+    `score` is MinimaxAI's heuristic score of the position (ignoring a win),
+    updated by apply() from just the lines through the square played.
     """
 
-    board: List[str]
+    x_mask: int = 0
+    o_mask: int = 0
     next_player: Player = "X"
+    last_move: Optional[Move] = None
+    won_by: Optional[Player] = field(default=None, repr=False, compare=False)
+    zkey: int = field(default=0, repr=False, compare=False)
+    score: int = field(default=0, repr=False, compare=False)
+    geo: Geometry = field(default=DEFAULT_GEOMETRY, repr=False)
 
     @staticmethod
-    def new() -> "TicTacToe":
-        return TicTacToe(board=[" "] * 25, next_player="X")
+    def new(n: int = SIZE, k: int = WIN_LENGTH) -> "TicTacToe":
+        return TicTacToe(x_mask=0, o_mask=0, next_player="X", geo=geometry(n, k))
+
+    @staticmethod
+    def from_board(board: Sequence[str], next_player: Player = "X", k: int = WIN_LENGTH) -> "TicTacToe":
+        """Build a state from an n*n-element list of 'X', 'O' and ' '."""
+        n = math.isqrt(len(board))
+        if n * n != len(board):
+            raise ValueError(f"A board of {len(board)} squares is not square.")
+        x = o = 0
+        for i, v in enumerate(board):
+            if v == "X":
+                x |= 1 << i
+            elif v == "O":
+                o |= 1 << i
+        return TicTacToe.from_masks(x, o, next_player, geometry(n, k))
+
+    @staticmethod
+    def from_masks(x_mask: int, o_mask: int, next_player: Player = "X",
+                   geo: Geometry = DEFAULT_GEOMETRY) -> "TicTacToe":
+        """Build a state from two bitboards, filling in `won_by`, `zkey` and `score`."""
+        zkey = geo.zobrist_o_to_move if next_player == "O" else 0
+        for i in _bits(x_mask):
+            zkey ^= geo.zobrist["X"][i]
+        for i in _bits(o_mask):
+            zkey ^= geo.zobrist["O"][i]
+        # No move history here, so fall back to a full scan once.
+        won_by = "X" if geo.has_line(x_mask) else "O" if geo.has_line(o_mask) else None
+        score = sum(geo.line_score[code] for code in geo.line_codes(x_mask, o_mask))
+        return TicTacToe(x_mask=x_mask, o_mask=o_mask, next_player=next_player, won_by=won_by, zkey=zkey,
+                         score=score, geo=geo)
+
+    @cached_property
+    def board(self) -> List[str]:
+        x, o = self.x_mask, self.o_mask
+        return ["X" if x >> i & 1 else "O" if o >> i & 1 else " " for i in range(self.geo.n_cells)]
+
+    def empty_mask(self) -> int:
+        return self.geo.full_mask & ~(self.x_mask | self.o_mask)
 
     def legal_moves(self) -> List[Move]:
-        return [i for i, v in enumerate(self.board) if v == " "]
+        return _bits(self.empty_mask())
 
     def apply(self, move: Move) -> "TicTacToe":
-        if self.board[move] != " ":
+        geo = self.geo
+        bit = 1 << move
+        if not 0 <= move < geo.n_cells:
+            raise ValueError(f"Illegal move: there is no square {move}.")
+        if (self.x_mask | self.o_mask) & bit:
             raise ValueError(f"Illegal move: square {move} is not empty.")
-        b = self.board.copy()
-        b[move] = self.next_player
-        return TicTacToe(board=b, next_player=("O" if self.next_player == "X" else "X"))
+        player = self.next_player
+        mine = (self.x_mask if player == "X" else self.o_mask) | bit
+        cell_masks = geo.cell_masks[move]
+        won_by = self.won_by
+        if won_by is None:
+            for m in cell_masks:
+                if mine & m == m:
+                    won_by = player
+                    break
+        zkey = self.zkey ^ geo.zobrist_move[player][move]
+        # line codes before the move, from the masks
+        x, o = self.x_mask, self.o_mask
+        step = geo.code_step[player]
+        o_step = geo.k + 1
+        line_score = geo.line_score
+        score = self.score
+        for m in cell_masks:
+            code = (x & m).bit_count() + o_step * (o & m).bit_count()
+            score += line_score[code + step] - line_score[code]
+        if player == "X":
+            return TicTacToe(mine, o, "O", move, won_by, zkey, score, geo)
+        return TicTacToe(x, mine, "X", move, won_by, zkey, score, geo)
 
     def winner(self) -> Optional[Player]:
-        for a, b, c in WIN_LINES:
-            if self.board[a] != " " and self.board[a] == self.board[b] == self.board[c]:
-                return self.board[a]
-        return None
+        return self.won_by
 
     def is_terminal(self) -> bool:
-        return self.winner() is not None or " " not in self.board
+        return self.won_by is not None or (self.x_mask | self.o_mask) == self.geo.full_mask
 
     def outcome_value(self) -> int:
         """Return +1 for X win, -1 for O win, 0 for draw/non-terminal."""
-        w = self.winner()
+        w = self.won_by
         if w == "X":
             return 1
         if w == "O":
@@ -74,11 +296,162 @@ class TicTacToe:
 
         # AI-Generated code for rendering the board. No need to understand this for the assignment.
 
+        n = self.geo.n
+        width = max(3, len(str(self.geo.n_cells - 1)) + 1)
         rows = []
-        for r in range(0, 25, 5):
-            row = "|".join(f"{cell(i):^3}" for i in range(r, r + 5))
+        for r in range(0, n * n, n):
+            row = "|".join(f"{cell(i):^{width}}" for i in range(r, r + n))
             rows.append(row)
-            if r < 20:
-                rows.append("---+---+---+---+---")
+            if r < n * (n - 1):
+                rows.append("+".join("-" * width for _ in range(n)))
         return "\n".join(rows)
 
+
+def prompt_move(state: TicTacToe) -> int:
+    """Ask the human for a square until they name an empty one."""
+    last = state.geo.n_cells - 1
+    while True:
+        raw = input(f"Enter your move (0-{last}): ").strip()
+        if not raw.isdigit():
+            print(f"Please enter a number from 0 to {last}.")
+            continue
+        move = int(raw)
+        if move not in range(last + 1):
+            print(f"Move must be between 0 and {last}.")
+            continue
+        if move not in state.legal_moves():
+            print("That square is not available. Try again.")
+            continue
+        return move
+
+
+class SearchBoard:
+    """Mutable board used inside the search engines.
+
+    TicTacToe.apply() builds a new state object for every child, which is
+    most of what a search allocates. A SearchBoard instead changes itself in
+    place: make(move) plays a move and unmake() takes back the most recent
+    one, using an undo stack. It has the same read-only interface as
+    TicTacToe (legal_moves, is_terminal, outcome_value, board, masks, zkey,
+    geo), so evaluation and symmetry code accepts either.
+
+    It also keeps the count code of every line in `line_codes` (see
+    Geometry.line_score) and the running heuristic `score`; make() and
+    unmake() adjust both for the lines through the square played.
+
+    make() does not check that the move is legal; the engines only play moves
+    from legal_moves().
+    """
+
+    __slots__ = ("x_mask", "o_mask", "next_player", "last_move", "won_by", "zkey",
+                 "line_codes", "score", "geo", "_moves", "_won_at", "_root_last_move",
+                 "_cell_masks", "_cell_lines", "_zobrist", "_line_score")
+
+    def __init__(self, state: TicTacToe) -> None:
+        geo = state.geo
+        self.x_mask = state.x_mask
+        self.o_mask = state.o_mask
+        self.next_player = state.next_player
+        self.last_move = state.last_move
+        self.won_by = state.won_by
+        self.zkey = state.zkey
+        self.line_codes = geo.line_codes(state.x_mask, state.o_mask)
+        self.score = state.score
+        self.geo = geo
+        # The undo stack is just the moves made. won_by only ever changes on the
+        # move that completes a line, so remembering how deep the stack was at
+        # that point is enough to undo it.
+        self._moves: List[Move] = []
+        self._won_at = 0
+        self._root_last_move = state.last_move
+        # the geometry tables make() and unmake() use on every call
+        self._cell_masks = geo.cell_masks
+        self._cell_lines = geo.cell_lines
+        self._zobrist = geo.zobrist_move
+        self._line_score = geo.line_score
+
+    def make(self, move: Move) -> None:
+        player = self.next_player
+        moves = self._moves
+        moves.append(move)
+        bit = 1 << move
+        if player == "X":
+            mine = self.x_mask = self.x_mask | bit
+            self.next_player = "O"
+        else:
+            mine = self.o_mask = self.o_mask | bit
+            self.next_player = "X"
+        if self.won_by is None:
+            for m in self._cell_masks[move]:
+                if mine & m == m:
+                    self.won_by = player
+                    self._won_at = len(moves)
+                    break
+        self.zkey ^= self._zobrist[player][move]
+        self.last_move = move
+        codes = self.line_codes
+        line_score = self._line_score
+        step = self.geo.code_step[player]
+        score = self.score
+        for k in self._cell_lines[move]:
+            code = codes[k]
+            codes[k] = code + step
+            score += line_score[code + step] - line_score[code]
+        self.score = score
+
+    def unmake(self) -> None:
+        moves = self._moves
+        move = moves.pop()
+        if len(moves) < self._won_at:
+            self.won_by = None
+            self._won_at = 0
+        self.last_move = moves[-1] if moves else self._root_last_move
+        bit = 1 << move
+        if self.next_player == "O":  # X made the move being taken back
+            player = "X"
+            self.x_mask ^= bit
+        else:
+            player = "O"
+            self.o_mask ^= bit
+        self.next_player = player
+        self.zkey ^= self._zobrist[player][move]
+        codes = self.line_codes
+        line_score = self._line_score
+        step = self.geo.code_step[player]
+        score = self.score
+        for k in self._cell_lines[move]:
+            code = codes[k]
+            codes[k] = code - step
+            score += line_score[code - step] - line_score[code]
+        self.score = score
+
+    def to_state(self) -> TicTacToe:
+        """Snapshot of the current position as an immutable TicTacToe."""
+        return TicTacToe(self.x_mask, self.o_mask, self.next_player, self.last_move, self.won_by, self.zkey,
+                         self.score, self.geo)
+
+    @property
+    def board(self) -> List[str]:
+        x, o = self.x_mask, self.o_mask
+        return ["X" if x >> i & 1 else "O" if o >> i & 1 else " " for i in range(self.geo.n_cells)]
+
+    def empty_mask(self) -> int:
+        return self.geo.full_mask & ~(self.x_mask | self.o_mask)
+
+    def legal_moves(self) -> List[Move]:
+        return _bits(self.empty_mask())
+
+    def winner(self) -> Optional[Player]:
+        return self.won_by
+
+    def is_terminal(self) -> bool:
+        return self.won_by is not None or (self.x_mask | self.o_mask) == self.geo.full_mask
+
+    def outcome_value(self) -> int:
+        """Return +1 for X win, -1 for O win, 0 for draw/non-terminal."""
+        w = self.won_by
+        return 1 if w == "X" else -1 if w == "O" else 0
+
+
+# Anything the engines can search: an immutable state or a SearchBoard.
+Board = Union[TicTacToe, SearchBoard]
@@ -0,0 +1,85 @@
+"""Transposition table for the alpha-beta search.
+
+Positions are stored under their Zobrist key (`TicTacToe.zkey`). Each entry
+remembers the value found, how deep the search below it went, whether that
+value is exact or only a bound (alpha-beta may have cut the search short),
+and the best move, which the search tries first next time.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from tictactoe import Move
+
+
+# Bound types
+EXACT = 0  # value is the true minimax value
+LOWER = 1  # search failed high: true value >= value
+UPPER = 2  # search failed low:  true value <= value
+
+
+@dataclass
+class TTEntry:
+    key: int
+    value: int
+    depth: int
+    flag: int
+    best_move: Optional[Move]
+    generation: int
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results.
+
+    `max_entries` slots are allocated up front and a key lives in slot
+    key % max_entries. When two positions want the same slot the one searched
+    deeper wins (depth-preferred), except that entries left over from an
+    earlier search (older `generation`) can always be overwritten, so the
+    table does not fill up with positions from moves ago.
+    """
+
+    def __init__(self, max_entries: int = 1 << 20) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.max_entries = max_entries
+        self.slots: List[Optional[TTEntry]] = [None] * max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.cutoffs = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def new_search(self) -> None:
+        """Mark everything stored so far as belonging to an older search."""
+        self.generation += 1
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        entry = self.slots[key % self.max_entries]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: int, depth: int, flag: int, best_move: Optional[Move]) -> None:
+        i = key % self.max_entries
+        old = self.slots[i]
+        if old is not None and old.key != key:
+            if old.generation == self.generation and old.depth > depth:
+                return  # keep the deeper result from this search
+            self.evictions += 1
+        self.slots[i] = TTEntry(key, value, depth, flag, best_move, self.generation)
+        self.stores += 1
+
+    def clear(self) -> None:
+        self.slots = [None] * self.max_entries
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.cutoffs = self.stores = self.evictions = 0
+
+    def __len__(self) -> int:
+        return sum(1 for e in self.slots if e is not None)
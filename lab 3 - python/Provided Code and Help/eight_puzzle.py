@@ -1,21 +1,70 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from math import isqrt
+from typing import Dict, List, Tuple
 
-Grid = Tuple[int, ...]  # length 9; 0 represents the blank
+Grid = Tuple[int, ...]  # length n*n (9 for the 8-puzzle); 0 represents the blank
+
+
+@dataclass(frozen=True)
+class Geometry:
+    """Everything about an n x n board that does not depend on the tiles.
+
+    Built once per size by geometry(n) and shared by every state of that
+    size.
+    """
+    n: int
+    cells: int
+    offsets: Dict[str, int]                     # how far the blank moves for each move, as in apply()
+    moves: Tuple[Tuple[Tuple[str, int], ...], ...]  # moves[blank]: (move, new blank square), in legal_moves() order
+    coords: Tuple[Tuple[int, int], ...]         # (x, y) of each square
+    bits: int                                   # bits per square in a packed state
+    blank_shift: int                            # where the packed blank square starts
+
+
+@lru_cache(maxsize=None)
+def geometry(n: int) -> Geometry:
+    if n < 2:
+        raise ValueError("the board must be at least 2 x 2")
+    cells = n * n
+    offsets = {'U': -n, 'D': n, 'L': -1, 'R': 1}
+    moves = []
+    for blank in range(cells):
+        row, col = divmod(blank, n)
+        legal = []
+        if row != 0:        # blank not in the top row
+            legal.append('D')
+        if row != n - 1:    # blank not in the bottom row
+            legal.append('U')
+        if col != 0:        # blank not in the left column
+            legal.append('R')
+        if col != n - 1:    # blank not in the right column
+            legal.append('L')
+        moves.append(tuple((m, blank - offsets[m]) for m in legal))
+    coords = tuple((i % n, i // n) for i in range(cells))
+    bits = max(4, (cells - 1).bit_length())
+    return Geometry(n, cells, offsets, tuple(moves), coords, bits, bits * cells)
 
 
 @dataclass(frozen=True)
 class PuzzleState:
-    """Immutable 8-puzzle state.
+    """Immutable sliding-tile puzzle state (the 8-puzzle unless the grid is bigger).
 
     Representation:
-      - A 1D tuple of length 9 (row-major).
+      - A 1D tuple of length n*n (row-major).
       - 0 represents the blank.
     """
     grid: Grid
 
+    @property
+    def geo(self) -> Geometry:
+        n = isqrt(len(self.grid))
+        if n * n != len(self.grid):
+            raise ValueError(f"a grid of {len(self.grid)} tiles is not square")
+        return geometry(n)
+
     def blank_index(self) -> int:
         return self.grid.index(0)
 
@@ -25,21 +74,11 @@ class PuzzleState:
         TODO (student):
           - Use the blank location to determine which moves are valid.
           - Return a list containing any of: 'U','D','L','R'.
-        """
-
-        blank_index = self.blank_index()
-        legal_moves = []
 
-        if blank_index not in [0, 1, 2]:  # blank  not in the top row
-            legal_moves.append('D')
-        if blank_index not in [6, 7, 8]:  # blank in bottom row
-            legal_moves.append('U')
-        if blank_index not in [0, 3, 6]:  # blank in left column
-            legal_moves.append('R')
-        if blank_index not in [2, 5, 8]:  # blank in right column
-            legal_moves.append('L')
+        The edge checks are done once per board size in geometry().
+        """
 
-        return legal_moves
+        return [move for move, _ in self.geo.moves[self.blank_index()]]
     
     def apply(self, move: str) -> "PuzzleState":
         """Return a new state produced by applying one move.
@@ -52,12 +91,7 @@ class PuzzleState:
         if move not in self.legal_moves():
             raise ValueError(f"Illegal move: {move}")
         
-        switch = {
-            'U': -3,
-            'D': 3,
-            'L': -1,
-            'R': 1
-        }
+        switch = self.geo.offsets
 
         # ^ dictionary to determine the index change based on the move taken
 
@@ -77,15 +111,108 @@ class PuzzleState:
 
     def pretty_lines(self) -> List[str]:
         out = []
-        for r in range(3):
+        n = self.geo.n
+        for r in range(n):
             row = []
-            for c in range(3):
-                v = self.grid[r * 3 + c]
+            for c in range(n):
+                v = self.grid[r * n + c]
                 row.append(" " if v == 0 else str(v))
             out.append(" ".join(row))
         return out
 
 
+def is_solvable(start: PuzzleState, goal: PuzzleState) -> bool:
+    """Whether `goal` can be reached from `start` at all.
+
+    Every move swaps the blank with a tile, so it flips the parity of the
+    permutation taking `start` to `goal` and moves the blank one square.
+    The two parities therefore change together, and only half of all
+    arrangements can reach `goal`: those where they agree.
+    """
+    where = {tile: i for i, tile in enumerate(goal.grid)}
+    perm = [where[tile] for tile in start.grid]
+    swaps = 0
+    seen = [False] * len(perm)
+    for i in range(len(perm)):
+        length = 0
+        while not seen[i]:
+            seen[i] = True
+            i = perm[i]
+            length += 1
+        swaps += max(length - 1, 0)  # a cycle of length L is L - 1 swaps
+    (x1, y1), (x2, y2) = start.geo.coords[start.blank_index()], start.geo.coords[goal.blank_index()]
+    return swaps % 2 == (abs(x1 - x2) + abs(y1 - y2)) % 2
+
+
+def check_puzzle(start: PuzzleState, goal: PuzzleState) -> Geometry:
+    """The board of `start` and `goal`; ValueError if they are not the same
+    size, not proper puzzles, or `goal` cannot be reached from `start`."""
+    geo = start.geo
+    if goal.geo is not geo:
+        raise ValueError("start and goal are different sizes")
+    for state in (start, goal):
+        if sorted(state.grid) != list(range(geo.cells)):
+            raise ValueError(f"{state.grid} is not the tiles 0..{geo.cells - 1}")
+    if not is_solvable(start, goal):
+        raise ValueError("Unsolvable: the goal cannot be reached from this start.")
+    return geo
+
+
+# Packed states
+#
+# The searches generate hundreds of thousands of states, so internally a state
+# is a single int: the tile on square i sits in bits b*i..b*i+b-1, where b is
+# geo.bits (4 up to the 15-puzzle, 0 = blank), and the blank's square is
+# cached above them, from bit geo.blank_shift up. A move just moves one
+# tile's bits into the blank's place.
+
+def pack(state: PuzzleState) -> int:
+    geo = state.geo
+    code = 0
+    for i, v in enumerate(state.grid):
+        code |= v << (geo.bits * i)
+    return code | state.blank_index() << geo.blank_shift
+
+
+def unpack(code: int, geo: Geometry) -> PuzzleState:
+    mask = (1 << geo.bits) - 1
+    return PuzzleState(tuple((code >> (geo.bits * i)) & mask for i in range(geo.cells)))
+
+
+def packed_children(code: int, geo: Geometry) -> List[Tuple[str, int]]:
+    """(move, packed child) for every legal move from packed state `code`."""
+    bits, shift = geo.bits, geo.blank_shift
+    mask = (1 << bits) - 1
+    blank = code >> shift
+    tiles = code & ((1 << shift) - 1)
+    out = []
+    for move, square in geo.moves[blank]:
+        tile = (tiles >> (bits * square)) & mask
+        # the tile leaves `square` and fills the blank's old square
+        child = tiles ^ (tile << (bits * square)) ^ (tile << (bits * blank))
+        out.append((move, child | square << shift))
+    return out
+
+
+@lru_cache(maxsize=None)
+def manhattan_table(goal: PuzzleState) -> Tuple[Tuple[int, ...], ...]:
+    """dist[tile][cell]: Manhattan distance from `cell` to `tile`'s square in `goal`.
+
+    Built once per goal; the blank (tile 0) always counts 0.
+    """
+    # https://www.almabetter.com/bytes/tutorials/artificial-intelligence/8-puzzle-problem-in-ai
+    euclidean_grid = goal.geo.coords  # (x, y) of each square
+
+    dist = [[0] * len(euclidean_grid) for _ in euclidean_grid]
+    for goal_index, tile in enumerate(goal.grid):
+        if tile == 0:  # skip blank
+            continue
+        x2, y2 = euclidean_grid[goal_index]  # goal position of tile
+        for cell, (x1, y1) in enumerate(euclidean_grid):
+            dist[tile][cell] = abs(x2 - x1) + abs(y2 - y1)
+    return tuple(tuple(row) for row in dist)
+
+
 def heuristic(state: PuzzleState, goal: PuzzleState) -> int:
     """Heuristic for A* search.
 
@@ -97,27 +224,22 @@ def heuristic(state: PuzzleState, goal: PuzzleState) -> int:
       - Sum of all distances in manhattan
       - For each item in state tuple, find which index it belongs to in the goal state
         and compare how far it is from current state.
-    """
 
-    euclidean_grid = [(0,0),(1,0),(2,0),
-                      (0,1),(1,1),(2,1),
-                      (0,2),(1,2),(2,2)]
-    
-    sum_of_distances = 0
+    The distances come from manhattan_table(), so nothing is searched for
+    here. A search that knows its parent's h can use manhattan_delta()
+    instead of calling this for every child.
+    """
 
-    for initial_index, square in enumerate(state.grid):
-        if square == 0: # skip blank
-            continue
-        goal_index = goal.grid.index(square)
+    dist = manhattan_table(goal)
+    return sum(dist[square][index] for index, square in enumerate(state.grid))
 
-        x1, y1 = euclidean_grid[initial_index] # current position of square
-        x2, y2 = euclidean_grid[goal_index] # goal position of square
 
-        x = abs(x2 - x1) # absolute distance of x and y
-        y = abs(y2 - y1)
-        
-        sum_of_distances += (x + y)
+def manhattan_delta(dist: Tuple[Tuple[int, ...], ...], code: int, child: int, geo: Geometry) -> int:
+    """Change in Manhattan distance from packed state `code` to its packed `child`.
 
-    return sum_of_distances
-
-        # https://www.almabetter.com/bytes/tutorials/artificial-intelligence/8-puzzle-problem-in-ai
\ No newline at end of file
+    Only one tile moves: from the child's blank square to the parent's.
+    """
+    moved_from = child >> geo.blank_shift
+    moved_to = code >> geo.blank_shift
+    tile = (code >> (geo.bits * moved_from)) & ((1 << geo.bits) - 1)
+    return dist[tile][moved_to] - dist[tile][moved_from]
@@ -0,0 +1,274 @@
+"""Additive pattern databases for the sliding-tile puzzles.
+
+Manhattan distance treats every tile as if the others were not there. A
+pattern database (PDB) does better for a group of tiles (a "pattern"): it
+stores, for every way those tiles can be placed on the board, the exact
+number of moves of *pattern tiles* needed to bring them home, with the other
+tiles treated as interchangeable blanks. If the tiles are split into
+disjoint patterns (e.g. 6-6-3 on the 15-puzzle), each move moves a tile of
+only one pattern, so the patterns' values can be added and the sum is still
+a lower bound on the solution length.
+
+A table is built by breadth-first search backwards from the goal over the
+positions of the pattern tiles and the blank. Moving the blank onto a
+non-pattern square costs nothing, onto a pattern tile costs one move (a
+0-1 BFS). The blank is then minimised out and the table stored with one
+byte per placement, indexed by the rank of the tiles' squares (see rank()).
+
+Running this file builds the tables for a board and writes them to disk:
+
+    python pattern_db.py --size 4
+    python pattern_db.py --size 4 --patterns 1,2,3,4,5/6,7,8,9,10/11,12,13,14,15
+
+The file is the magic string, the board size and the number of tiles in the
+pattern (one byte each), the pattern tiles and the goal grid (one byte per
+entry), then the table. PatternDB memory-maps it, so loading costs nothing.
+Large patterns take a while to build in Python (the 6-tile ones of the
+15-puzzle search 57.7 million states, several minutes each), but only once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from math import perm
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from eight_puzzle import PuzzleState, geometry
+
+
+MAGIC = b"PUZPDB01"
+HEADER = struct.Struct(f"<{len(MAGIC)}sBB")
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb")
+UNSEEN = 255
+
+# Disjoint patterns for goals with the tiles in order and the blank last.
+# Six-tile patterns do not fit a Python BFS on the 24-puzzle (2.4 billion
+# states each), so it gets six blocks of four.
+DEFAULT_PATTERNS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 5, 6, 9, 10), (3, 4, 7, 8, 11, 12), (13, 14, 15)),
+    5: ((1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20), (11, 12, 16, 17), (13, 14, 18, 19),
+        (21, 22, 23, 24)),
+}
+
+
+def rank(squares: Sequence[int], cells: int) -> int:
+    """Index of the placement `squares` (distinct, in pattern order) among
+    all perm(cells, len(squares)) placements.
+
+    Each square is numbered among the squares not taken by the earlier
+    tiles, and those numbers are read as a mixed-radix number (bases cells,
+    cells - 1, ...). Ranks run from 0 with no gaps, so the table needs no
+    more bytes than there are placements.
+    """
+    r = 0
+    taken = 0
+    for i, sq in enumerate(squares):
+        r = r * (cells - i) + sq - (taken & ((1 << sq) - 1)).bit_count()
+        taken |= 1 << sq
+    return r
+
+
+def unrank(r: int, m: int, cells: int) -> List[int]:
+    """The placement of `m` tiles with rank `r` (inverse of rank())."""
+    digits = [0] * m
+    for i in range(m - 1, -1, -1):
+        r, digits[i] = divmod(r, cells - i)
+    squares = []
+    free = list(range(cells))
+    for d in digits:
+        squares.append(free.pop(d))
+    return squares
+
+
+def build_table(n: int, goal: PuzzleState, pattern: Sequence[int]) -> bytes:
+    """Moves of pattern tiles needed from every placement of `pattern`, by rank."""
+    cells = n * n
+    k = len(pattern)
+    m = k + 1  # the pattern tiles and the blank, blank last
+    moves = geometry(n).moves
+
+    depth = bytearray([UNSEEN]) * perm(cells, m)
+    expanded = bytearray(len(depth))
+    depth[rank([goal.grid.index(t) for t in pattern] + [goal.grid.index(0)], cells)] = 0
+
+    d = 0
+    while True:
+        level = bytes([d])
+        i = depth.find(level)
+        if i == -1:
+            break
+        while i != -1:
+            # depth-first through the free (blank-only) moves from here;
+            # states they reach are at this depth too
+            stack = [i]
+            while stack:
+                r = stack.pop()
+                if expanded[r]:
+                    continue
+                expanded[r] = 1
+                squares = unrank(r, m, cells)
+                blank = squares[k]
+                for _, sq in moves[blank]:
+                    child = squares[:]
+                    child[k] = sq
+                    cost = 0
+                    if sq in squares:  # a pattern tile slides into the blank
+                        child[squares.index(sq)] = blank
+                        cost = 1
+                    c = rank(child, cells)
+                    if cost == 0 and depth[c] > d:
+                        depth[c] = d
+                        stack.append(c)
+                    elif cost == 1 and depth[c] == UNSEEN:
+                        depth[c] = d + 1
+            i = depth.find(level, i + 1)
+        d += 1
+        if d >= UNSEEN:
+            raise ValueError("pattern too large for one-byte distances")
+
+    # the blank is the last, base (cells - k), digit of the rank, so the
+    # placements of the pattern tiles alone are consecutive runs
+    width = cells - k
+    return bytes(min(depth[j:j + width]) for j in range(0, len(depth), width))
+
+
+def pdb_path(n: int, pattern: Sequence[int], directory: str = DEFAULT_DIR) -> str:
+    return os.path.join(directory, f"pdb{n}x{n}_{'-'.join(map(str, pattern))}.bin")
+
+
+def save(path: str, n: int, goal: PuzzleState, pattern: Sequence[int], table: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n, len(pattern)))
+        f.write(bytes(pattern))
+        f.write(bytes(goal.grid))
+        f.write(table)
+
+
+class PatternDB:
+    """One memory-mapped pattern database."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n, k = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not a pattern database (or was built by an older version).")
+        cells = self.n * self.n
+        offset = HEADER.size
+        self.pattern: Tuple[int, ...] = tuple(self.data[offset:offset + k])
+        offset += k
+        self.goal = PuzzleState(tuple(self.data[offset:offset + cells]))
+        offset += cells
+        self.table = memoryview(self.data)[offset:]
+        if len(self.table) != perm(cells, k):
+            raise ValueError(f"{path} is truncated.")
+
+    def close(self) -> None:
+        self.table.release()
+        self.data.close()
+
+    def lookup(self, where: Sequence[int]) -> int:
+        """The table entry when tile t is on square where[t]."""
+        return self.table[rank([where[t] for t in self.pattern], self.n * self.n)]
+
+
+class AdditivePDB:
+    """Sum of disjoint pattern databases: an admissible heuristic.
+
+    h(state) works on PuzzleStates, of_grid(grid) on any sequence of tiles
+    (such as IDA*'s working list) and packed(code) on the searches' packed
+    states (see eight_puzzle.pack).
+    """
+
+    def __init__(self, dbs: Iterable[PatternDB]) -> None:
+        self.dbs = list(dbs)
+        self.n = self.dbs[0].n
+        self.goal = self.dbs[0].goal
+        seen: set = set()
+        for db in self.dbs:
+            if db.n != self.n or db.goal != self.goal:
+                raise ValueError("pattern databases are for different puzzles")
+            if seen & set(db.pattern):
+                raise ValueError("patterns overlap, so they cannot be added")
+            seen |= set(db.pattern)
+
+    def close(self) -> None:
+        for db in self.dbs:
+            db.close()
+
+    def h(self, state: PuzzleState) -> int:
+        return self.of_grid(state.grid)
+
+    def of_grid(self, grid: Sequence[int]) -> int:
+        where = [0] * len(grid)
+        for sq, t in enumerate(grid):
+            where[t] = sq
+        return sum(db.lookup(where) for db in self.dbs)
+
+    def packed(self, code: int) -> int:
+        geo = geometry(self.n)
+        mask = (1 << geo.bits) - 1
+        where = [0] * geo.cells
+        for sq in range(geo.cells):
+            where[(code >> (geo.bits * sq)) & mask] = sq
+        return sum(db.lookup(where) for db in self.dbs)
+
+
+def load(n: int, goal: PuzzleState, patterns: Optional[Sequence[Sequence[int]]] = None,
+         directory: str = DEFAULT_DIR, build: bool = True) -> AdditivePDB:
+    """The additive PDB for `patterns` (default DEFAULT_PATTERNS[n]),
+    building and saving any table that is not on disk yet."""
+    patterns = patterns or DEFAULT_PATTERNS[n]
+    dbs = []
+    for pattern in patterns:
+        path = pdb_path(n, pattern, directory)
+        if not os.path.exists(path):
+            if not build:
+                raise FileNotFoundError(path)
+            save(path, n, goal, pattern, build_table(n, goal, pattern))
+        db = PatternDB(path)
+        if db.goal != goal:
+            db.close()
+            raise ValueError(f"{path} was built for a different goal; delete it to rebuild.")
+        dbs.append(db)
+    return AdditivePDB(dbs)
+
+
+def parse_patterns(text: str) -> Tuple[Tuple[int, ...], ...]:
+    return tuple(tuple(int(t) for t in group.split(",")) for group in text.split("/"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build additive pattern databases for a sliding-tile puzzle.")
+    parser.add_argument("--size", type=int, default=3, choices=sorted(DEFAULT_PATTERNS),
+                        help="board side (3 = 8-puzzle, 4 = 15-puzzle, 5 = 24-puzzle)")
+    parser.add_argument("--patterns", type=parse_patterns,
+                        help="tiles of each pattern, e.g. 1,2,3,4/5,6,7,8 (default for the size)")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="where the tables are stored")
+    args = parser.parse_args()
+
+    n = args.size
+    goal = PuzzleState(tuple(range(1, n * n)) + (0,))
+    patterns = args.patterns or DEFAULT_PATTERNS[n]
+    tiles = sorted(t for p in patterns for t in p)
+    if len(set(tiles)) != len(tiles) or not set(tiles) <= set(goal.grid) - {0}:
+        parser.error("patterns must be disjoint groups of tiles 1..n*n-1")
+
+    for pattern in patterns:
+        path = pdb_path(n, pattern, args.dir)
+        start = time.perf_counter()
+        table = build_table(n, goal, pattern)
+        save(path, n, goal, pattern, table)
+        print(f"{path}: {len(table):,} entries, max {max(table)}, {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
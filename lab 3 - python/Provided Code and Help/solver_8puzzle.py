@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import math
 import time
 from dataclasses import dataclass
 from heapq import heappop, heappush
 from typing import Dict, List, Optional, Tuple
 
-from eight_puzzle import PuzzleState, heuristic
+from eight_puzzle import (Geometry, PuzzleState, check_puzzle, heuristic, manhattan_delta, manhattan_table,
+                          pack, packed_children, unpack)
+import pattern_db
 
 
 @dataclass
@@ -27,73 +30,186 @@ def reconstruct_path(node: Node) -> List[Node]:
     return path
 
 
+# While searching, a node is the tuple (packed state, parent node, move, g, h)
+# rather than a Node: it is much smaller and quicker to build, and only the
+# nodes on the solution path are ever turned into Nodes (see _to_node).
+# A* keeps the node's heuristic in h so a child's can be found from it by
+# looking at the one tile that moved; UCS leaves it 0.
+PackedNode = Tuple[int, Optional[tuple], Optional[str], int, int]
+
+
+def _to_node(packed: PackedNode, f: int, geo: Geometry) -> Node:
+    """Decode a search node and its ancestors into linked Nodes."""
+    chain = []
+    cur: Optional[PackedNode] = packed
+    while cur is not None:
+        chain.append(cur)
+        cur = cur[1]
+    node: Optional[Node] = None
+    for code, _, move, g, _ in reversed(chain):
+        node = Node(unpack(code, geo), node, move, g=g, f=g)
+    node.f = f
+    return node
+
+
 def uniform_cost_search(start: PuzzleState, goal: PuzzleState) -> Tuple[Node, int, int]:
+    geo = check_puzzle(start, goal)
     counter = 0
-    open_heap: List[Tuple[int, int, Node]] = []
-    start_node = Node(start, None, None, g=0, f=0)
-    heappush(open_heap, (start_node.f, counter, start_node))
+    open_heap: List[Tuple[int, int, PackedNode]] = []
+    start_code = pack(start)
+    goal_code = pack(goal)
+    heappush(open_heap, (0, counter, (start_code, None, None, 0, 0)))
     counter += 1
 
-    best_g: Dict[PuzzleState, int] = {start: 0}
+    best_g: Dict[int, int] = {start_code: 0}
     expanded = 0
 
     while open_heap:
-        _, _, node = heappop(open_heap)
+        f, _, node = heappop(open_heap)
         expanded += 1
 
-        if node.state.is_goal(goal):
-            return node, expanded, len(open_heap)
+        code, _, _, g, _ = node
+        if code == goal_code:
+            return _to_node(node, f, geo), expanded, len(open_heap)
 
-        for mv in node.state.legal_moves():
-            nxt = node.state.apply(mv)
-            ng = node.g + 1
-            if nxt not in best_g or ng < best_g[nxt]:
+        ng = g + 1
+        for mv, nxt in packed_children(code, geo):
+            if ng < best_g.get(nxt, ng + 1):
                 best_g[nxt] = ng
-                nn = Node(nxt, node, mv, g=ng, f=ng)  # UCS priority = g
-                heappush(open_heap, (nn.f, counter, nn))
+                heappush(open_heap, (ng, counter, (nxt, node, mv, ng, 0)))  # UCS priority = g
                 counter += 1
 
     raise RuntimeError("No solution found.")
 
 
-def astar_search(start: PuzzleState, goal: PuzzleState) -> Tuple[Node, int, int]:
+def astar_search(start: PuzzleState, goal: PuzzleState,
+                 pdb: Optional[pattern_db.AdditivePDB] = None) -> Tuple[Node, int, int]:
+    """A* with Manhattan distance, or with the pattern databases `pdb` if given."""
+    if pdb is not None and pdb.goal != goal:
+        raise ValueError("pattern databases were built for a different goal")
+    geo = check_puzzle(start, goal)
     counter = 0
-    open_heap: List[Tuple[int, int, Node]] = []
+    open_heap: List[Tuple[int, int, PackedNode]] = []
+    start_code = pack(start)
+    goal_code = pack(goal)
 
-    h0 = heuristic(start, goal)
-    start_node = Node(start, None, None, g=0, f=h0)
-    heappush(open_heap, (start_node.f, counter, start_node))
+    dist = manhattan_table(goal)
+    h0 = heuristic(start, goal) if pdb is None else pdb.h(start)
+    heappush(open_heap, (h0, counter, (start_code, None, None, 0, h0)))
     counter += 1
 
-    best_g: Dict[PuzzleState, int] = {start: 0}
+    best_g: Dict[int, int] = {start_code: 0}
     expanded = 0
 
     while open_heap:
-        _, _, node = heappop(open_heap)
+        f, _, node = heappop(open_heap)
         expanded += 1
 
-        if node.state.is_goal(goal):
-            return node, expanded, len(open_heap)
+        code, _, _, g, h = node
+        if code == goal_code:
+            return _to_node(node, f, geo), expanded, len(open_heap)
 
-        for mv in node.state.legal_moves():
-            nxt = node.state.apply(mv)
-            ng = node.g + 1
-            if nxt not in best_g or ng < best_g[nxt]:
+        ng = g + 1
+        for mv, nxt in packed_children(code, geo):
+            if ng < best_g.get(nxt, ng + 1):
                 best_g[nxt] = ng
-                h = heuristic(nxt, goal)
-                nn = Node(nxt, node, mv, g=ng, f=ng + h)
-                heappush(open_heap, (nn.f, counter, nn))
+                if pdb is None:
+                    nh = h + manhattan_delta(dist, code, nxt, geo)
+                else:
+                    nh = pdb.packed(nxt)
+                heappush(open_heap, (ng + nh, counter, (nxt, node, mv, ng, nh)))
                 counter += 1
 
     raise RuntimeError("No solution found.")
 
 
-def write_output(path_nodes: List[Node], expanded: int, unexpanded: int, outfile: str) -> None:
+# the move that takes the blank straight back
+INVERSE = {'U': 'D', 'D': 'U', 'L': 'R', 'R': 'L'}
+
+
+def ida_star_search(start: PuzzleState, goal: PuzzleState,
+                    pdb: Optional[pattern_db.AdditivePDB] = None) -> Tuple[Node, List[Tuple[int, int]]]:
+    """IDA*: depth-first searches with a rising bound on f = g + h.
+
+    Each iteration searches every path whose f stays within the bound; the
+    next bound is the smallest f that went over it. Only the current path is
+    kept, in one grid changed in place and undone on the way back, so memory
+    is O(depth) however many nodes are searched. Moves that undo the
+    previous move are skipped. Returns the goal node and (bound, nodes
+    searched) for every iteration.
+    """
+    if pdb is not None and pdb.goal != goal:
+        raise ValueError("pattern databases were built for a different goal")
+    geo = check_puzzle(start, goal)
+    dist = manhattan_table(goal)
+    goal_grid = list(goal.grid)
+    grid = list(start.grid)
+    moves: List[str] = []
+    nodes = 0
+    found = -1
+
+    def search(blank: int, g: int, h: int, bound: int, last: Optional[str]) -> int:
+        """`found`, or the smallest f above `bound` seen below this node."""
+        nonlocal nodes
+        nodes += 1
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and grid == goal_grid:
+            return found
+        smallest = math.inf
+        back = INVERSE.get(last)
+        for move, square in geo.moves[blank]:
+            if move == back:
+                continue
+            tile = grid[square]
+            grid[blank], grid[square] = tile, 0
+            if pdb is None:
+                nh = h + dist[tile][blank] - dist[tile][square]
+            else:
+                nh = pdb.of_grid(grid)
+            moves.append(move)
+            t = search(square, g + 1, nh, bound, move)
+            if t == found:
+                return found
+            moves.pop()
+            grid[blank], grid[square] = 0, tile
+            smallest = min(smallest, t)
+        return smallest
+
+    h0 = heuristic(start, goal) if pdb is None else pdb.h(start)
+    bound = h0
+    iterations: List[Tuple[int, int]] = []
+    while True:
+        nodes = 0
+        t = search(start.blank_index(), 0, h0, bound, None)
+        iterations.append((bound, nodes))
+        if t == found:
+            break
+        if t == math.inf:
+            raise RuntimeError("No solution found.")
+        bound = t
+
+    node = Node(start, None, None, g=0, f=h0)
+    for g, move in enumerate(moves, 1):
+        node = Node(node.state.apply(move), node, move, g=g, f=g)
+    node.f = bound
+    return node, iterations
+
+
+def write_output(path_nodes: List[Node], expanded: int, unexpanded: int, outfile: str,
+                 iterations: Optional[List[Tuple[int, int]]] = None, seconds: Optional[float] = None) -> None:
     with open(outfile, "w", encoding="utf-8") as f:
         for n in path_nodes:
             f.write(n.state.one_line() + "\n")
         f.write(f"\n###### Nodes expanded\n{expanded}\n")
         f.write(f"## Nodes unexpanded\n{unexpanded}\n")
+        if iterations is not None:
+            f.write("## Nodes per iteration (f bound: nodes)\n")
+            for bound, nodes in iterations:
+                f.write(f"{bound}: {nodes}\n")
+        if seconds is not None:
+            f.write(f"## Time (seconds)\n{seconds:.4f}\n")
 
 
 def main() -> None:
@@ -104,7 +220,11 @@ def main() -> None:
     print("Choose search strategy:")
     print("1) Uniform Cost Search (UCS)")
     print("2) A* Search")
-    choice = input("Enter 1 or 2: ").strip()
+    print("3) A* Search with pattern databases")
+    print("4) IDA* Search")
+    choice = input("Enter 1, 2, 3 or 4: ").strip()
+
+    iterations = None
 
     t0 = time.time()
     if choice == "1":
@@ -113,13 +233,24 @@ def main() -> None:
     elif choice == "2":
         node, expanded, unexpanded = astar_search(start, goal)
         outfile = "outputAstar.txt"
+    elif choice == "3":
+        pdb = pattern_db.load(goal.geo.n, goal)  # built and saved on first use
+        node, expanded, unexpanded = astar_search(start, goal, pdb)
+        outfile = "outputAstarPDB.txt"
+    elif choice == "4":
+        node, iterations = ida_star_search(start, goal)
+        expanded, unexpanded = sum(n for _, n in iterations), 0  # IDA* keeps no open list
+        outfile = "outputIDAstar.txt"
     else:
         print("Invalid choice.")
         return
     t1 = time.time()
 
     path_nodes = reconstruct_path(node)
-    write_output(path_nodes, expanded, unexpanded, outfile)
+    if iterations is None:
+        write_output(path_nodes, expanded, unexpanded, outfile)
+    else:
+        write_output(path_nodes, expanded, unexpanded, outfile, iterations, t1 - t0)
 
     print(f"Solution written to: {outfile}")
     print(f"Moves: {len(path_nodes) - 1}")
@@ -10,16 +10,24 @@ Requirements:
 """
 
 from __future__ import annotations
-from typing import Optional, Tuple
-from tictactoe import TicTacToe, Move, Player
+from typing import Dict, Optional, Tuple
+from game import TicTacToe, Move, Player, canonical_key, unique_moves
 
 # You may import the Game/Board types used in the provided support code.
 
 class AlphaBetaAI:
-    """Alpha-Beta Pruning AI for Tic‑Tac‑Toe."""
+    """Alpha-Beta Pruning AI for Tic‑Tac‑Toe.
 
-    def __init__(self, ai_player: Player = "X") -> None:
+    With `symmetry` on, root moves that mirror each other are only searched
+    once, and exact values are cached under the position's canonical form so
+    all rotations/reflections of a position share them. Values that are only
+    bounds (the search was cut off) are not cached.
+    """
+
+    def __init__(self, ai_player: Player = "X", symmetry: bool = True) -> None:
         self.ai_player = ai_player
+        self.symmetry = symmetry
+        self.cache: Dict[Tuple, int] = {}
 
     def alphabeta_value(self, state: TicTacToe, player: Player, alpha: int, beta: int, depth: int = 0) -> int:
         """Return the minimax value of `state` for `player` using alpha-beta pruning.
@@ -39,7 +47,13 @@ class AlphaBetaAI:
         
         if state.is_terminal():
             return state.outcome_value()
-            
+
+        if self.symmetry:
+            key = (canonical_key(state)[0], player)
+            if key in self.cache:
+                return self.cache[key]
+            alpha_orig, beta_orig = alpha, beta
+
         next_player = state.next_player
 
         if next_player == player:  # maximiser (AI player)
@@ -51,8 +65,7 @@ class AlphaBetaAI:
                 alpha = max(alpha, value)
                 if alpha >= beta:
                     break
-            return value
-            
+
         else:  # minimiser (AI opponent)
             value = 2
             for move in state.legal_moves():
@@ -62,7 +75,10 @@ class AlphaBetaAI:
                 beta = min(beta, value)
                 if alpha >= beta:
                     break
-            return value        
+
+        if self.symmetry and alpha_orig < value < beta_orig:
+            self.cache[key] = value
+        return value
 
     def best_move_alphabeta(self, state: TicTacToe, player: Player) -> Optional[Move]:
         """Return the best move for `player` from `state` using alpha-beta pruning.
@@ -77,13 +93,14 @@ class AlphaBetaAI:
         alpha = -2
         beta = 2
         best_move = None
+        self.cache.clear()
 
         if state.next_player == player:
             best_val = -2 
         else:
             best_val = 2
 
-        for move in state.legal_moves():
+        for move in (unique_moves(state) if self.symmetry else state.legal_moves()):
             child_state = state.apply(move)
             val = self.alphabeta_value(child_state, player, alpha, beta)
 
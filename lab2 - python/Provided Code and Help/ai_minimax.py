@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 
-from tictactoe import TicTacToe, Move, Player
+from game import TicTacToe, Move, Player, canonical_key, unique_moves
 
 
 @dataclass
@@ -13,9 +13,16 @@ class MinimaxAI:
     The AI assumes:
     - 'X' is the maximizing player
     - 'O' is the minimizing player
+
+    With `symmetry` on, root moves that mirror each other are only searched
+    once, and minimax values are cached under the position's canonical form so
+    every rotation/reflection (and every move order) reaching the same
+    position shares one search. The cache is cleared at the start of each move.
     """
 
     ai_player: Player = "X"
+    symmetry: bool = True
+    cache: Dict[Tuple, int] = field(default_factory=dict, repr=False, compare=False)
 
     def choose_move(self, state: TicTacToe) -> Move:
         if state.is_terminal():
@@ -25,8 +32,9 @@ class MinimaxAI:
 
         best_move: Move = -1
         best_value = float("-inf") if self.ai_player == "X" else float("inf")
+        self.cache.clear()
 
-        for move in state.legal_moves():
+        for move in (unique_moves(state) if self.symmetry else state.legal_moves()):
             child = state.apply(move)
             value = self.minimax(child)
 
@@ -57,14 +65,22 @@ class MinimaxAI:
         if state.is_terminal():
             return state.outcome_value()
 
+        # Symmetric copies have the same value, so look it up before searching.
+        if self.symmetry:
+            key = canonical_key(state)[0]
+            if key in self.cache:
+                return self.cache[key]
+
         # Recursive case: explore all successor states.
         if state.next_player == "X":
             best = float("-inf")
             for move in state.legal_moves():
                 best = max(best, self.minimax(state.apply(move)))
-            return int(best)
         else:
             best = float("inf")
             for move in state.legal_moves():
                 best = min(best, self.minimax(state.apply(move)))
-            return int(best)
+
+        if self.symmetry:
+            self.cache[key] = int(best)
+        return int(best)
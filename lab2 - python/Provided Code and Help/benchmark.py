@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import time
 
-from tictactoe import TicTacToe
+from game import new_game
 from ai_minimax import MinimaxAI
 from ai_alphabeta_stub import AlphaBetaAI
+from tablebase import TablebaseAI
 
 
 def time_ai(ai, n: int = 1) -> float:
@@ -12,7 +13,7 @@ def time_ai(ai, n: int = 1) -> float:
 
     For a fair comparison we time `choose_move()` repeatedly from the same state.
     """
-    state = TicTacToe.new()
+    state = new_game()
     start = time.perf_counter()
     for _ in range(n):
         _ = ai.choose_move(state)
@@ -24,13 +25,16 @@ def main() -> None:
     n = 400
     minimax = MinimaxAI(ai_player="X")
     alphabeta = AlphaBetaAI(ai_player="X")
+    tablebase = TablebaseAI(ai_player="X")  # builds tablebase.bin on first use
 
     t1 = time_ai(minimax, n=n)
     t2 = time_ai(alphabeta, n=n)
+    t3 = time_ai(tablebase, n=n)
 
     print(f"Average time per AI move over {n} runs:")
     print(f"  Minimax (no pruning): {t1:.6f} s")
     print(f"  Alpha-beta:           {t2:.6f} s")
+    print(f"  Tablebase lookup:     {t3:.6f} s")
     if t2 > 0:
         print(f"  Speedup:              {t1/t2:.2f}x")
 
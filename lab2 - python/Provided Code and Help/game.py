@@ -0,0 +1,32 @@
+"""The 3x3 game for this lab, taken from Programming Assignment 1.
+
+Programming Assignment 1 has the n x n, k-in-a-row TicTacToe, its board
+symmetries and the console prompt. This lab plays the same game on a 3x3
+board, so it uses that code instead of keeping a copy: this module puts the
+assignment's folder on the import path and re-exports what the lab needs.
+The folder is appended, so this lab's own modules keep their names.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+SHARED_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir,
+                                          "2509530", "Programming Assignment 1"))
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from tictactoe import Move, Player, TicTacToe, prompt_move  # noqa: E402
+from symmetry import canonical_key, unique_moves  # noqa: E402
+
+SIZE = 3
+WIN_LENGTH = 3
+
+__all__ = ["Move", "Player", "TicTacToe", "prompt_move", "canonical_key", "unique_moves", "new_game",
+           "SIZE", "WIN_LENGTH"]
+
+
+def new_game() -> TicTacToe:
+    """Empty 3x3 board, three in a row wins, X to move."""
+    return TicTacToe.new(SIZE, WIN_LENGTH)
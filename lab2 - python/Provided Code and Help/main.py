@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from tictactoe import TicTacToe
+from game import new_game, prompt_move
 from ai_minimax import MinimaxAI
 from ai_alphabeta_stub import AlphaBetaAI
 import benchmark as bm
@@ -12,24 +12,8 @@ from benchmark import time_ai
 # from ai_alphabeta_stub import AlphaBetaAI
 
 
-def prompt_move(state: TicTacToe) -> int:
-    while True:
-        raw = input("Enter your move (0-8): ").strip()
-        if not raw.isdigit():
-            print("Please enter a number from 0 to 8.")
-            continue
-        move = int(raw)
-        if move not in range(9):
-            print("Move must be between 0 and 8.")
-            continue
-        if move not in state.legal_moves():
-            print("That square is not available. Try again.")
-            continue
-        return move
-
-
 def main() -> None:
-    state = TicTacToe.new()
+    state = new_game()
 
     # AI plays X, human plays O
     ai = MinimaxAI(ai_player="X")
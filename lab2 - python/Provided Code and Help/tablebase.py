@@ -0,0 +1,145 @@
+"""Perfect-play table for 3x3 Tic-Tac-Toe.
+
+Every board is numbered in base 3: square i contributes 3**i times 0 (empty),
+1 (X) or 2 (O). That gives 3**9 = 19,683 indices, of which only 5,478 are
+reachable in a real game. Whose turn it is follows from the board (X moves
+first), so the index identifies the whole state.
+
+build_tablebase() finds the reachable positions, then solves them backwards:
+each move adds a stone, so handling positions from 9 stones down to 0 means
+every child is solved before its parent (retrograde analysis). The result is
+one byte per index, written to a file:
+
+    low 2 bits:  0 = O wins, 1 = draw, 2 = X wins, 3 = not reachable
+    high 4 bits: best move + 1 (0 for a finished game)
+
+Tablebase opens that file with mmap, so loading it is instant and a lookup is
+one index computation and one byte read. TablebaseAI answers choose_move()
+from it; its moves are the same ones MinimaxAI picks.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+from game import SIZE, WIN_LENGTH, TicTacToe, Move, Player, new_game
+
+
+N_SQUARES = SIZE * SIZE
+N_INDICES = 3 ** N_SQUARES
+POWERS = tuple(3 ** i for i in range(N_SQUARES))
+DIGIT = {" ": 0, "X": 1, "O": 2}
+
+UNREACHABLE = 3
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebase.bin")
+
+
+def index_of(board: List[str]) -> int:
+    """Base-3 index of a board."""
+    return sum(DIGIT[v] * p for v, p in zip(board, POWERS))
+
+
+def pack(value: int, best_move: Optional[Move]) -> int:
+    return (0 if best_move is None else best_move + 1) << 4 | (value + 1)
+
+
+def unpack(entry: int) -> Tuple[int, Optional[Move]]:
+    """(value, best_move) from one table byte; value is +1/0/-1 from X's view."""
+    code = entry & 3
+    if code == UNREACHABLE:
+        raise KeyError("Position cannot occur in a real game.")
+    move = entry >> 4
+    return code - 1, (move - 1 if move else None)
+
+
+def solve() -> bytearray:
+    """Compute the table: value and best move of every reachable position."""
+    # forward pass: collect reachable positions, grouped by number of stones
+    layers: List[Dict[int, TicTacToe]] = [{} for _ in range(N_SQUARES + 1)]
+    start = new_game()
+    layers[0][index_of(start.board)] = start
+    for stones in range(N_SQUARES):
+        for state in layers[stones].values():
+            if state.is_terminal():
+                continue
+            for move in state.legal_moves():
+                child = state.apply(move)
+                layers[stones + 1].setdefault(index_of(child.board), child)
+
+    # backward pass: children (one more stone) are always solved first
+    table = bytearray([UNREACHABLE] * N_INDICES)
+    for stones in range(N_SQUARES, -1, -1):
+        for idx, state in layers[stones].items():
+            if state.is_terminal():
+                table[idx] = pack(state.outcome_value(), None)
+                continue
+            maximising = state.next_player == "X"
+            best_value = -2 if maximising else 2
+            best_move: Optional[Move] = None
+            for move in state.legal_moves():
+                # the child index is this one plus the new stone
+                child = idx + DIGIT[state.next_player] * POWERS[move]
+                value = (table[child] & 3) - 1
+                # first move (in square order) with the best value, like MinimaxAI
+                if (value > best_value) if maximising else (value < best_value):
+                    best_value, best_move = value, move
+            table[idx] = pack(best_value, best_move)
+    return table
+
+
+def build_tablebase(path: str = DEFAULT_PATH) -> None:
+    """Solve the game and write the table to `path`."""
+    table = solve()
+    with open(path, "wb") as f:
+        f.write(table)
+
+
+class Tablebase:
+    """Read-only view of a table file, built first if it does not exist yet."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        if not os.path.exists(path) or os.path.getsize(path) != N_INDICES:
+            build_tablebase(path)
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        self.data.close()
+
+    def lookup(self, state: TicTacToe) -> Tuple[int, Optional[Move]]:
+        """(value, best_move) for `state`; raises KeyError if it is unreachable."""
+        if (state.geo.n, state.geo.k) != (SIZE, WIN_LENGTH):
+            raise ValueError("The tablebase only covers the 3x3 board, three in a row.")
+        return unpack(self.data[index_of(state.board)])
+
+    def value(self, state: TicTacToe) -> int:
+        """Game-theoretic value of `state`: +1 X wins, -1 O wins, 0 draw."""
+        return self.lookup(state)[0]
+
+    def best_move(self, state: TicTacToe) -> Optional[Move]:
+        return self.lookup(state)[1]
+
+
+class TablebaseAI:
+    """Perfect player that looks its moves up instead of searching."""
+
+    def __init__(self, ai_player: Player = "X", path: str = DEFAULT_PATH) -> None:
+        self.ai_player = ai_player
+        self.table = Tablebase(path)
+
+    def choose_move(self, state: TicTacToe) -> Move:
+        if state.is_terminal():
+            raise ValueError("Game is already over.")
+        if state.next_player != self.ai_player:
+            raise ValueError("It is not the AI's turn.")
+        return self.table.best_move(state)
+
+
+if __name__ == "__main__":
+    build_tablebase()
+    table = Tablebase()
+    reachable = sum(1 for b in table.data[:] if b & 3 != UNREACHABLE)
+    print(f"Wrote {DEFAULT_PATH}: {N_INDICES} entries, {reachable} reachable positions.")
+    print(f"Value of the empty board: {table.value(new_game())}")